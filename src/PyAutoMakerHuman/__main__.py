@@ -1,3 +1,18 @@
+import argparse
+
+from .startup import profiler
+
+
+parser = argparse.ArgumentParser(prog="PyAutoMakerHuman")
+parser.add_argument("--front", default="0", help="정면 카메라 소스 (장치 번호, 동영상 파일, 이미지 폴더)")
+parser.add_argument("--side", default="1", help="측면 카메라 소스")
+parser.add_argument("--profile-startup", action="store_true", help="import, 모델 로드별 시작 시간을 측정해서 출력")
+args, _ = parser.parse_known_args()
+
+# GUI 모듈을 불러오기 전에 설치해야 import 시간이 기록됨
+if args.profile_startup:
+    profiler.install()
+
 from .gui import main
 
-main.start_main()
\ No newline at end of file
+main.start_main((args.front, args.side), args.profile_startup)
@@ -0,0 +1,181 @@
+import os
+import time
+from glob import glob
+from abc import abstractmethod, ABCMeta
+
+import cv2
+import numpy as np
+
+from .image import cv2_imread
+
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+class CameraSource(metaclass=ABCMeta):
+    """프레임을 (성공 여부, 프레임, 캡쳐 시각)으로 주는 카메라 소스 인터페이스
+    cv2.VideoCapture의 isOpened, read, release를 같은 형태로 제공
+    finished가 True면 더 이상 프레임이 없음 (파일 끝)
+    """
+    def __del__(self):
+        pass
+
+    @property
+    def finished(self) -> bool:
+        return False
+
+    @abstractmethod
+    def isOpened(self) -> bool:
+        pass
+
+    @abstractmethod
+    def read_frame(self) -> tuple[bool, np.ndarray, float]:
+        pass
+
+    def read(self) -> tuple[bool, np.ndarray]:
+        success, frame, _ = self.read_frame()
+        return success, frame
+
+    def release(self) -> None:
+        pass
+
+
+class CaptureSource(CameraSource):
+    """cv2.VideoCapture(카메라 장치)를 감싼 소스, 캡쳐 시각은 프레임을 읽은 시각(time.time)
+    """
+    def __init__(self, capture : cv2.VideoCapture):
+        self.capture = capture
+
+    def isOpened(self) -> bool:
+        return self.capture.isOpened()
+
+    def read_frame(self) -> tuple[bool, np.ndarray, float]:
+        success, frame = self.capture.read()
+        return success, frame, time.time()
+
+    def release(self) -> None:
+        self.capture.release()
+
+
+class DeviceSource(CaptureSource):
+    def __init__(self, index : int):
+        super().__init__(cv2.VideoCapture(index))
+        self.index = index
+
+
+class ReplaySource(CameraSource):
+    """녹화된 프레임을 재생하는 소스의 공통 부분
+    캡쳐 시각은 재생 시작부터의 영상 시간(초)이라 몇번을 재생해도 같음
+    realtime이 True면 영상 시간에 맞춰서 주고, False면 최대한 빠르게 줌
+    loop가 True면 끝나면 처음부터 다시 재생하고 시간은 계속 증가함
+    """
+    def __init__(self, fps : float, realtime : bool = True, loop : bool = False):
+        self.fps = fps if fps and fps > 0 else 30.0
+        self.realtime = realtime
+        self.loop = loop
+        self._frame_idx = 0
+        self._finished = False
+        self._start_time = None
+
+    @property
+    def finished(self) -> bool:
+        return self._finished
+
+    @abstractmethod
+    def read_next(self) -> tuple[bool, np.ndarray]:
+        """다음 프레임, 끝이면 (False, None)
+        """
+        pass
+
+    @abstractmethod
+    def rewind(self) -> None:
+        pass
+
+    def read_frame(self) -> tuple[bool, np.ndarray, float]:
+        if self._finished:
+            return False, None, 0.0
+
+        success, frame = self.read_next()
+        if not success and self.loop:
+            self.rewind()
+            success, frame = self.read_next()
+
+        if not success:
+            self._finished = True
+            return False, None, 0.0
+
+        timestamp = self._frame_idx / self.fps
+        self._frame_idx += 1
+        if self.realtime:
+            if self._start_time is None:
+                self._start_time = time.perf_counter()
+
+            delay = self._start_time + timestamp - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        return True, frame, timestamp
+
+
+class VideoFileSource(ReplaySource):
+    def __init__(self, video_path : str, realtime : bool = True, loop : bool = False):
+        self.video_path = video_path
+        self.capture = cv2.VideoCapture(video_path)
+        super().__init__(self.capture.get(cv2.CAP_PROP_FPS), realtime, loop)
+
+    def isOpened(self) -> bool:
+        return self.capture.isOpened() and not self._finished
+
+    def read_next(self) -> tuple[bool, np.ndarray]:
+        return self.capture.read()
+
+    def rewind(self) -> None:
+        self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def release(self) -> None:
+        self.capture.release()
+
+
+class ImageDirSource(ReplaySource):
+    """폴더의 이미지들을 이름 순서대로 fps 간격의 프레임으로 재생
+    """
+    def __init__(self, image_dir : str, fps : float = 30.0, realtime : bool = True, loop : bool = False):
+        super().__init__(fps, realtime, loop)
+        self.image_dir = image_dir
+        self.file_list = sorted(file for file in glob(os.path.join(image_dir, "*"))
+                                if os.path.splitext(file)[1].lower() in IMAGE_EXTENSIONS)
+        self._file_idx = 0
+
+    def isOpened(self) -> bool:
+        return len(self.file_list) > 0 and not self._finished
+
+    def read_next(self) -> tuple[bool, np.ndarray]:
+        while self._file_idx < len(self.file_list):
+            img = cv2_imread(self.file_list[self._file_idx])
+            self._file_idx += 1
+            if img is not None:
+                return True, img
+
+        return False, None
+
+    def rewind(self) -> None:
+        self._file_idx = 0
+
+
+def open_source(source, realtime : bool = True, loop : bool = False) -> CameraSource:
+    """장치 번호(int 또는 숫자 문자열), 동영상 파일, 이미지 폴더로 소스를 만드는 함수
+    이미 소스이거나 cv2.VideoCapture라면 그대로 또는 감싸서 리턴
+    """
+    if isinstance(source, CameraSource):
+        return source
+
+    if isinstance(source, cv2.VideoCapture):
+        return CaptureSource(source)
+
+    if isinstance(source, int) or str(source).isdigit():
+        return DeviceSource(int(source))
+
+    if os.path.isdir(source):
+        return ImageDirSource(source, realtime = realtime, loop = loop)
+
+    return VideoFileSource(source, realtime = realtime, loop = loop)
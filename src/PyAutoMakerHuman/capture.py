@@ -0,0 +1,127 @@
+import logging
+from threading import Thread, Event, Condition, local
+
+import cv2
+import numpy as np
+
+from .camera_source import CameraSource, open_source
+
+
+class FrameCapture(Thread):
+    """카메라 1개의 프레임을 별도 스레드에서 계속 읽고 가장 최근 프레임 1개만 보관하는 클래스
+    추론 쪽은 카메라 입출력을 기다리지 않고 가장 최신 프레임을 가져감
+    가져가기 전에 새 프레임으로 덮어쓰여진 프레임은 버려진 프레임으로 집계
+    cv2.VideoCapture의 isOpened, read, release를 같은 형태로 제공
+    camera는 CameraSource, cv2.VideoCapture 또는 open_source로 열 수 있는 값 (장치 번호, 동영상, 이미지 폴더)
+    wait_taken이 True면 가져가기 전에는 다음 프레임을 읽지 않으므로 버려지는 프레임이 없음 (녹화 재생용)
+    소스가 끝나면 스레드가 종료되고 기다리던 read_latest는 바로 리턴됨
+    """
+    RETRY_DELAY = 0.01
+
+    def __init__(self, camera : CameraSource or cv2.VideoCapture, name : str = "capture", wait_taken : bool = False):
+        super().__init__(name = name, daemon = True)
+        self.camera = open_source(camera)
+        self.wait_taken = wait_taken
+        self._exit_event = Event()
+        self._frame_condition = Condition()
+        self._local = local()
+
+        # 단일 슬롯 버퍼
+        self._frame : np.ndarray = None
+        self._seq = 0
+        self._timestamp = 0.0
+        self._taken = True
+
+        self._captured_count = 0
+        self._dropped_count = 0
+
+    def __del__(self):
+        pass
+
+    def isOpened(self) -> bool:
+        return self.camera.isOpened()
+
+    def run(self) -> None:
+        logging.debug(f"[+] {self.name} 스레드 시작")
+        while not self._exit_event.is_set():
+            if not self.camera.isOpened():
+                self._exit_event.wait(self.RETRY_DELAY * 10)
+                continue
+
+            success, frame, timestamp = self.camera.read_frame()
+            if not success:
+                if self.camera.finished:
+                    break
+
+                self._exit_event.wait(self.RETRY_DELAY)
+                continue
+
+            with self._frame_condition:
+                if self.wait_taken:
+                    self._frame_condition.wait_for(lambda : self._taken or self._exit_event.is_set())
+
+                if not self._taken:
+                    self._dropped_count += 1
+
+                self._frame = frame
+                self._timestamp = timestamp
+                self._seq += 1
+                self._taken = False
+                self._captured_count += 1
+                self._frame_condition.notify_all()
+
+        # 소스가 끝났다면 기다리는 쪽을 깨움
+        self.exit()
+        logging.debug(f"[+] {self.name} 스레드 종료")
+
+    def read_latest(self, last_seq : int = 0, timeout : float or None = None) -> tuple[int, float, np.ndarray] or None:
+        """last_seq 보다 새로운 프레임 중 가장 최근 프레임을 (번호, 캡쳐 시각, 프레임)으로 리턴하는 함수
+        timeout 동안 새 프레임이 없다면 None
+        """
+        with self._frame_condition:
+            if not self._frame_condition.wait_for(lambda : self._seq > last_seq or self._exit_event.is_set()
+                                                    , timeout):
+                return None
+
+            if self._seq <= last_seq:
+                return None
+
+            self._taken = True
+            self._frame_condition.notify_all()
+            return self._seq, self._timestamp, self._frame
+
+    def read(self, timeout : float or None = 2) -> tuple[bool, np.ndarray]:
+        """VideoCapture.read와 같은 형태, 호출한 스레드가 마지막으로 읽은 프레임보다 새로운 프레임을 리턴
+        """
+        frame_info = self.read_latest(getattr(self._local, "last_seq", 0), timeout)
+        if frame_info is None:
+            return False, None
+
+        self._local.last_seq, _, frame = frame_info
+        return True, frame
+
+    @property
+    def finished(self) -> bool:
+        """소스가 끝났거나 release돼서 캡쳐 스레드가 더 이상 프레임을 읽지 않음
+        """
+        return self._exit_event.is_set()
+
+    def get_stats(self) -> dict:
+        """캡쳐한 프레임 수와 가져가기 전에 버려진 프레임 수
+        """
+        with self._frame_condition:
+            return {"captured" : self._captured_count, "dropped" : self._dropped_count}
+
+    def exit(self) -> None:
+        self._exit_event.set()
+        with self._frame_condition:
+            self._frame_condition.notify_all()
+
+    def join(self, timeout = None) -> None:
+        self.exit()
+        if self.is_alive():
+            return super().join(timeout)
+
+    def release(self) -> None:
+        self.join()
+        self.camera.release()
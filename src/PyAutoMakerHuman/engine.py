@@ -0,0 +1,832 @@
+import os
+import time
+import logging
+from threading import Thread, Event, Lock
+from queue import Empty
+from typing import Any
+import random
+
+import cv2
+import numpy as np
+
+from .image import cv2_putText
+from .hand import HandResult, draw_landmark_overlay
+from . import models_dir
+from .hand_train import HandTrainer
+from .inference import InferenceService, DetectorSet, get_service
+from .capture import FrameCapture
+from .pipeline import DropQueue, Stage, Pipeline
+from .motion import MotionGate
+from .gui.exception import FrameException, ExitException, StopException, DataModifyExecption, NextExecption \
+                            , SourceEndException
+
+
+STUDY_COMBINATION_CHAR_DICT = {
+    "ㄲ" : "ㄱㄱ"
+    , "ㄸ" : "ㄷㄷ"
+    , "ㅃ" : "ㅂㅂ"
+    , "ㅆ" : "ㅅㅅ"
+    , "ㅉ" : "ㅈㅈ"
+    , "ㅘ" : "ㅗㅏ"
+    , "ㅙ" : "ㅗㅐ"
+    , "ㅝ" : "ㅜㅓ"
+    , "ㅞ" : "ㅜㅔ"
+}
+
+ANSWER_FAIL = 0
+ANSWER_PROCESSING = 1
+ANSWER_SUCCESS = 2
+
+DIRECTION_NONE = 0
+DIRECTION_LEFT = 1
+DIRECTION_RIGHT = 2
+
+PROCESS_DATA = 1
+PROCESS_SUCCESS = 2
+PROCESS_FAIL = 3
+PROCESS_NEXT_CHAR = 4
+PROCESS_TIME = 5
+PROCESS_LEVEL = 6
+PROCESS_QUESTION = 7
+
+RUN_STUDY = 1
+RUN_TEST = 2
+
+def run_mode_check(ret_val : Any = None):
+    def decorator(func):
+        def wrapper(*args, **kwargs):
+            self = args[0]
+            if self._run_mode == RUN_TEST:
+                return ret_val
+            
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+class CameraChannel:
+    """카메라 1대의 검출기, 단계 사이 큐, 추적 상태를 묶은 클래스
+    카메라마다 검출기를 따로 가지므로 정면과 측면을 동시에 추론할 수 있음
+    """
+    def __init__(self, name : str, camera : FrameCapture, classifier : HandTrainer
+                , mirror_mode_check : bool, detect_queue_size : int, result_queue_size : int
+                , gate_config : dict = None):
+        self.name = name
+        self.camera = camera
+        self.classifier = classifier
+        # 미러모드 체크는 정면 캠에서만 함
+        self.mirror_mode_check = mirror_mode_check
+        self.detect_queue = DropQueue(detect_queue_size)
+        self.result_queue = DropQueue(result_queue_size)
+        # 채널이 추론하는 동안 set
+        self.enable_event = Event()
+        # 다음 검출 전에 추적 상태를 초기화해야 하면 set
+        self.reset_event = Event()
+        self.reset_event.set()
+        # 정지 화면, 빈 화면은 검출하지 않고 이전 결과를 씀, gate_config는 MotionGate 인자
+        self.motion_gate = MotionGate(**(gate_config or dict()))
+        # 마지막으로 가져간 프레임 번호, 마지막으로 받아간 분류 결과의 캡쳐 시각
+        self.frame_seq = 0
+        self.result_timestamp = 0.0
+
+    def __del__(self):
+        pass
+
+
+class EngineObserver:
+    """RecognitionEngine의 상태 변화를 받는 인터페이스, 필요한 함수만 재정의해서 사용
+    on_frame은 render 단계 스레드, 나머지는 엔진 스레드에서 호출됨
+    """
+    def on_frame(self, img : np.ndarray) -> None:
+        pass
+
+    def on_answer(self, code : int) -> None:
+        """ANSWER_* (학습 모드)
+        """
+        pass
+
+    def on_direction(self, code : int) -> None:
+        """DIRECTION_* (학습 모드)
+        """
+        pass
+
+    def on_process(self, code : int, data : dict) -> None:
+        """PROCESS_*, data는 코드별 정보 (시험 모드)
+        """
+        pass
+
+
+def get_box_center(box : tuple[int, int, int, int]) -> tuple[int, int]:
+    # QRect(x, y, w, h).center()와 같은 값
+    x, y, w, h = box
+    return int((2 * x + w - 1) / 2), int((2 * y + h - 1) / 2)
+
+
+class RecognitionEngine(Thread):
+    """카메라 추론과 학습, 시험 상태 처리를 하는 스레드, Qt 없이 동작함
+    결과는 observer(EngineObserver)로 알리며 render가 False면 화면용 그리기를 모두 건너뜀
+    """
+
+    FRAME_READ_TIMEOUT = 2
+    RESULT_READ_TIMEOUT = 0.1
+    # 단계 사이 큐 크기, 처리가 밀리면 오래된 항목을 버림
+    DETECT_QUEUE_SIZE = 1
+    RESULT_QUEUE_SIZE = 1
+    RENDER_QUEUE_SIZE = 2
+    PREDICT_TIMEOUT = 2
+    PREDICT_THRESH = 0.8
+    # 추적할 손 갯수, HandTrainer 기본값과 같음
+    MAX_NUM_HANDS = 2
+    # 카메라 채널마다 만드는 MotionGate 인자, 생성자의 gate_config로 바꿀 수 있음
+    MOTION_GATE_CONFIG = dict()
+
+    COLOR_RED = (0, 0, 255)
+    COLOR_GREEN = (0, 255, 0)
+    COLOR_ORENGE = (0, 127, 255)
+
+    CHAR_DIRECTION_RIGHT = 1
+    CHAR_DIRECTION_DOWN = 2
+    CHAR_DIRECTION_LEFT = 3
+    CHAR_DIRECTION_UP = 4
+
+    CHAR_CORRECTION_INFO_DICT = dict()
+    
+    CHAR_EXCEPTION_LIST = tuple()
+
+    def __init__(self, cameras : tuple[FrameCapture, FrameCapture], run_mode : int
+                , observer : EngineObserver = None, render : bool = True, service : InferenceService = None
+                , gate_config : dict = None):
+        """gate_config : MotionGate 인자 (max_reuse_frames, max_reuse_time, motion_threshold 등)
+        없으면 MOTION_GATE_CONFIG를 사용
+        """
+        super().__init__()
+        self._observer = observer or EngineObserver()
+        self.render = render
+        # 검출기와 모델은 프로세스에 1개인 서비스에서 run 동안만 빌려씀
+        self._service = service or get_service()
+        self._detectors : DetectorSet = None
+        # 이벤트, 락
+        self._exit_event = Event()
+        self._stop_event = Event()
+        self._next_event = Event()
+        self._question_modify_event = Event()
+        self._question_modify_lock = Lock()
+
+        # 작동 관련 변수
+        self.CHAR_CORRECTION_INFO_DICT = self._service.get_correction_info()
+        self._correction_pairs, self._correction_pair_index = self.get_correction_pairs(self.CHAR_CORRECTION_INFO_DICT)
+        self._run_mode = run_mode
+        self._mirror_mode = True
+        self._questions = list()
+        #self._mirror_classifier = HandTrainer()
+        #self._mirror_classifier.load(os.path.join(models_dir, "mirror_model"))
+        self._pre_target_char = ""
+        self._pre_target_char_box = None
+
+        # 카메라
+        self._front_camera = cameras[0]
+        self._side_camera = cameras[1]
+
+        # 검출, 분류, 화면 출력을 단계별 스레드로 나눠서 처리
+        # 정면은 항상, 측면은 측면 판단이 필요한 글자일 때만 정면과 동시에 추론함
+        # 분류 단계는 현재 목표 글자로 처리하고, 상태 처리(study, test)는 분류 결과만 받아감
+        # 검출기(추적 상태)는 카메라마다 따로 두고 모델은 공유함, 검출기는 run에서 빌려서 채움
+        gate_config = self.MOTION_GATE_CONFIG if gate_config is None else gate_config
+        self._front_channel = CameraChannel("front", self._front_camera, None, True
+                                            , self.DETECT_QUEUE_SIZE, self.RESULT_QUEUE_SIZE, gate_config)
+        self._side_channel = CameraChannel("side", self._side_camera, None, False
+                                            , self.DETECT_QUEUE_SIZE, self.RESULT_QUEUE_SIZE, gate_config)
+        self._front_channel.enable_event.set()
+        self._target_char = None
+        self._render_queue = DropQueue(self.RENDER_QUEUE_SIZE)
+
+        stages = list()
+        for channel in [self._front_channel, self._side_channel]:
+            # 프레임 대기 시간 초과(FrameException)는 다시 시도하고 그 외의 예외는 엔진 스레드에서 다시 발생시킴
+            # 소스가 끝나면(SourceEndException) 파이프라인을 멈추고 엔진도 끝냄
+            stages.append(Stage(f"{channel.name}_detect", lambda item, channel = channel : self.detect_stage(channel)
+                                , None, channel.detect_queue, (FrameException,), (SourceEndException,)))
+            stages.append(Stage(f"{channel.name}_classify", lambda item, channel = channel : self.classify_stage(channel, item)
+                                , channel.detect_queue, channel.result_queue))
+
+        if self.render:
+            stages.append(Stage("render", self.render_stage, self._render_queue))
+
+        self._pipeline = Pipeline(stages)
+
+    @staticmethod
+    def get_correction_pairs(correction_info : dict) -> tuple[np.ndarray, dict]:
+        """보정 정보의 랜드마크 쌍을 한번에 계산할 수 있도록 (쌍 갯수, 2) 배열과 글자별 인덱스로 변환
+        """
+        pairs = sorted({tuple(pair) for _, pair in correction_info.values()})
+        pair_index = {char : pairs.index(tuple(pair)) for char, (_, pair) in correction_info.items()}
+
+        return np.array(pairs, dtype=np.intp), pair_index
+
+    def exit(self) -> None:
+        self._exit_event.set()
+
+    def join(self, timeout: float or None = None) -> None:
+        self.exit()
+        return super().join(timeout)
+
+    def start_work(self) -> None:
+        self._stop_event.clear()
+
+    def stop_work(self) -> None:
+        self._stop_event.set()
+
+    def next_work(self) -> None:
+        self._next_event.set()
+
+    def get_frame(self, channel : CameraChannel) -> tuple[float, np.ndarray]:
+        # 캡쳐 스레드가 보관중인 가장 최신 프레임을 (캡쳐 시각, 프레임)으로 가져옴, 이미 가져간 프레임이라면 새 프레임을 기다림
+        frame_info = channel.camera.read_latest(channel.frame_seq, self.FRAME_READ_TIMEOUT)
+        if frame_info is None:
+            if channel.camera.finished:
+                raise SourceEndException(f"{channel.name} 카메라 소스가 끝났습니다")
+
+            raise FrameException("프레임을 가져오는데 실패했습니다")
+
+        seq, timestamp, frame = frame_info
+        channel.frame_seq = seq
+        # 캡쳐 슬롯의 배열은 같은 카메라를 쓰는 다른 채널과 공유되므로 그리기 전에 항상 복사본을 만듬 (cv2.flip은 새 배열)
+        return timestamp, cv2.flip(frame, 1) if channel.mirror_mode_check and self.mirror_mode else frame.copy()
+
+    @property
+    def mirror_mode(self) -> bool:
+        # 프레임마다 읽으므로 락을 쓰지 않음, bool 참조 1개를 바꾸는 것이라 중간 상태가 없음
+        return self._mirror_mode
+
+    @mirror_mode.setter
+    def mirror_mode(self, value : bool) -> None:
+        # 거울모드는 랜드마크를 반전해서 같은 모델로 추론하므로 모델을 다시 불러오지 않음
+        self._mirror_mode = value
+        self._front_channel.reset_event.set()
+        logging.debug(f"[+] mirror mode change : {value}")
+
+    @property
+    def questions(self) -> list or dict:
+        with self._question_modify_lock:
+            questions = self._questions
+
+        return questions
+
+    @questions.setter
+    def questions(self, value : str or dict) -> None:
+        with self._question_modify_lock:
+            if self._run_mode == RUN_STUDY:
+                value = list(STUDY_COMBINATION_CHAR_DICT.get(value, value))
+                self._questions = list(value)
+            elif self._run_mode == RUN_TEST:
+                self._questions = value
+
+            self._question_modify_event.set()
+            logging.debug(f"[+] question change : {self._questions}")
+
+            #이전 정보 지움
+            self._pre_target_char = ""
+            self._pre_target_char_box = None
+
+            self._question_modify_event.set()
+
+    def draw_box(self, img : np.ndarray, box : tuple[int, int, int, int], color : tuple) -> np.ndarray:
+        if not self.render:
+            return img
+
+        x, y, w, h = box
+        return cv2.rectangle(img, (x, y), (x + w, y + h), color, 3)
+    
+    def draw_boxes(self, img : np.ndarray, boxes : list[tuple], color : tuple) -> np.ndarray:
+        for box in boxes:
+            img = self.draw_box(img, box, color)
+
+        return img
+
+    def draw_landmark(self, img : np.ndarray, landmarks : list) -> np.ndarray:
+        return draw_landmark_overlay(img, landmarks) if self.render else img
+
+    def draw_landmarks(self, img : np.ndarray, landmarks_list : list) -> np.ndarray:
+        return draw_landmark_overlay(img, landmarks_list) if self.render else img
+
+    def draw_text(self, img : np.ndarray, text : str, org : tuple, color : tuple) -> np.ndarray:
+        return cv2_putText(img, text, org, 3, color, 2) if self.render else img
+
+    def draw_line(self, img : np.ndarray, start : tuple, end : tuple, color : tuple, thickness : int = 2) -> np.ndarray:
+        return cv2.line(img, start, end, color, thickness) if self.render else img
+
+    def front_draw(self, img : np.ndarray) -> None:
+        # 화면 변환과 출력은 render 단계에서 처리
+        if self.render:
+            self._render_queue.put(img)
+
+    @run_mode_check(True)
+    def answer_fail(self) -> None:
+        self._observer.on_answer(ANSWER_FAIL)
+    
+    @run_mode_check(True)
+    def answer_processing(self) -> None:
+        self._observer.on_answer(ANSWER_PROCESSING)
+
+    @run_mode_check(True)
+    def answer_success(self) -> None:
+        self._observer.on_answer(ANSWER_SUCCESS)
+
+    def is_exit_set(self) -> bool:
+        self._pipeline.raise_error()
+        if self._exit_event.is_set():
+            raise ExitException()
+        
+        return False
+
+    def is_events_set(self) -> bool:
+        # 오류로 끝난 단계가 있으면 결과가 더 나오지 않으므로 기다리지 않고 예외를 발생시킴
+        self._pipeline.raise_error()
+        events = [self._exit_event, self._question_modify_event, self._stop_event, self._next_event]
+        exceptions = [ExitException, DataModifyExecption, StopException, NextExecption]
+
+        for event, exception in zip(events, exceptions):
+            if event.is_set():
+                raise exception()
+
+        return False
+
+    @property
+    def front_classifier(self) -> HandTrainer:
+        return self._front_channel.classifier
+
+    @property
+    def side_classifier(self) -> HandTrainer:
+        return self._side_channel.classifier
+
+    @property
+    def capture_stats(self) -> dict:
+        """카메라별 캡쳐한 프레임 수와 추론에 쓰이지 못하고 버려진 프레임 수
+        """
+        return {"front" : self._front_camera.get_stats(), "side" : self._side_camera.get_stats()}
+
+    @property
+    def detector_stats(self) -> dict:
+        """카메라별 손바닥 검출과 추적 비율
+        """
+        if self._detectors is None:
+            return {"front" : dict(), "side" : dict()}
+
+        return {"front" : self.front_classifier.get_stats(), "side" : self.side_classifier.get_stats()}
+
+    @property
+    def gate_stats(self) -> dict:
+        """카메라별 검출한 프레임과 움직임이 없어서 건너뛴 프레임 수
+        """
+        return {"front" : self._front_channel.motion_gate.get_stats(), "side" : self._side_channel.motion_gate.get_stats()}
+
+    @property
+    def frame_timestamp(self) -> float:
+        """상태 처리가 마지막으로 받아간 정면 결과의 캡쳐 시각, 녹화 재생이라면 영상 시간
+        """
+        return self._front_channel.result_timestamp
+
+    @property
+    def pipeline_stats(self) -> dict:
+        """단계별 처리 횟수, 지연시간(ms), 큐에 대기중인 항목 수와 버려진 항목 수
+        """
+        return self._pipeline.get_stats()
+
+    def predict_filter(self, predict_result : tuple) -> tuple:
+        def filter_proc(predict_result):
+            name, proba = predict_result
+            if proba >= self.PREDICT_THRESH:
+                return True
+            else:
+                return False
+
+        return tuple(filter(filter_proc, predict_result))
+
+    def detect_stage(self, channel : CameraChannel) -> tuple or None:
+        """채널 카메라의 최신 프레임에서 손을 검출하는 단계
+        """
+        if self._stop_event.is_set() or not channel.enable_event.is_set():
+            # 쉬는 동안의 추적 정보는 의미가 없으므로 다시 시작할 때 초기화
+            channel.reset_event.set()
+            self._exit_event.wait(self.RESULT_READ_TIMEOUT)
+            return None
+
+        timestamp, frame = self.get_frame(channel)
+        if channel.reset_event.is_set():
+            channel.reset_event.clear()
+            channel.classifier.reset()
+            channel.motion_gate.reset()
+            logging.debug(f"[+] {channel.name} tracking reset : {channel.classifier.get_stats()}"
+                            f", gate : {channel.motion_gate.get_stats()}")
+
+        return timestamp, frame, channel.motion_gate.detect(channel.classifier, frame, timestamp)
+
+    def classify_stage(self, channel : CameraChannel, item : tuple) -> tuple:
+        """검출 결과를 현재 목표 글자로 분류하는 단계, 처리할 때의 목표 글자를 같이 넘김
+        """
+        timestamp, frame, hand_result = item
+        target_char = self._target_char
+        mirror = channel.mirror_mode_check and self.mirror_mode
+        result = channel.classifier.classify(hand_result, mirror)
+        return target_char, timestamp, frame, result
+
+    def render_stage(self, img : np.ndarray) -> None:
+        self._observer.on_frame(img)
+
+    def next_result(self, channel : CameraChannel, target_char : str or None) -> tuple[np.ndarray, tuple]:
+        """channel에서 target_char로 처리된 분류 결과가 나올때까지 기다리는 함수
+        목표 글자가 바뀌기 전에 처리된 결과는 버림
+        """
+        self._target_char = target_char
+        while self.is_events_set() == False:
+            try:
+                result_target_char, timestamp, frame, result = channel.result_queue.get(self.RESULT_READ_TIMEOUT)
+            except Empty:
+                continue
+
+            if result_target_char != target_char:
+                continue
+
+            channel.result_timestamp = timestamp
+            return frame, result
+
+    def front_predict(self, target_char : str or None = None) -> tuple[np.ndarray, tuple[HandResult, tuple]]:
+        while self.is_events_set() == False:
+            frame, result = self.next_result(self._front_channel, target_char)
+            if result:
+                return frame, result
+
+            self.front_draw(frame)
+
+    def side_predict(self, target_char : str or None = None) -> tuple[np.ndarray, tuple[HandResult, tuple]]:
+        while self.is_events_set() == False:
+            frame, result = self.next_result(self._side_channel, target_char)
+            if result:
+                return frame, result
+
+    def front_side_predict(self, target_char : str) -> tuple[np.ndarray, tuple[HandResult, tuple]]:
+        # 정면에서 판단 불가능한 수형
+        except_char_list = ["ㅓ", "ㅕ", "ㅔ", "ㅖ"]
+
+        # 측면 채널은 정면과 동시에 추론하므로 정면 결과가 나올 때쯤 측면 결과도 준비되어 있음
+        if not target_char in except_char_list:
+            self._side_channel.enable_event.clear()
+            return self.front_predict(target_char)
+
+        self._side_channel.enable_event.set()
+        front_result = self.front_predict(target_char)
+        side_result = self.side_predict(target_char)
+        # 사이드 추론 결과가 이상하거나 비어있다면, 정면캠의 결과를 리턴
+        side_frame, (side_hand_result, side_predict_result) = side_result
+        for name, proba in side_predict_result:
+            if name in except_char_list:
+                return side_result
+                #return front_result[0], (side_hand_result, side_predict_result)
+        
+        return front_result
+
+    def until_predict(self, target_char : str) -> tuple[np.ndarray, tuple[HandResult, tuple, tuple]]:
+        while self.is_events_set() == False:
+            result = self.front_side_predict(target_char)
+            if not result:
+                continue
+
+            frame, predict_result = result
+            org_frame = frame.copy()
+            hand_result, predict_result = predict_result
+            # 오른손이 아니라면 다시
+            right_info = self.get_right_hand_info(hand_result, predict_result, target_char)
+            if not right_info:
+                self.front_draw(frame)
+                continue
+
+            idx, name, proba = right_info
+            box = hand_result.get_box_array()[idx].tolist()
+            landmarks = hand_result.get_landmark_array()[idx]
+
+            # 만약 타겟과 추론한 글자가 다르다면
+            if target_char != name:
+                self.answer_fail()
+                frame = self.draw_box(frame, box, self.COLOR_RED)
+                frame = self.draw_landmark(frame, landmarks)
+                self.front_draw(frame)
+                continue
+
+            return org_frame, (hand_result, predict_result, right_info)
+        
+    def check_char_pt(self, target_char : str, frame : np.ndarray, box : tuple[int, int, int, int]) -> bool:
+        if target_char == self._pre_target_char:
+            cur_x, _, cur_w, _ = box
+            cur_x = cur_x + int(cur_w / 2)
+            _, w, _ = frame.shape
+            frame_x_ragne = int(w * 0.3)
+            x_range= int(cur_w * 0.3)
+            x_range = x_range if x_range < frame_x_ragne else frame_x_ragne
+
+            pre_x, pre_y = get_box_center(self._pre_target_char_box)
+            diff_x = abs(cur_x - pre_x)
+            
+            # 만약 이동 반경이 너무 적다면 선 표시
+            if diff_x < x_range:
+                frame = self.draw_line(frame, (pre_x - x_range, pre_y), (pre_x + x_range, pre_y)
+                                        , self.COLOR_ORENGE, 6)
+
+                self.front_draw(frame)
+                return False
+
+        return True
+
+    def check_direction(self, target_char : str, frame : np.ndarray, hand_result : HandResult, right_info : tuple[int, str, float]) -> bool:
+        def get_direction_(base_direction : int, target_degree : int, error_range : tuple[int, int]) -> int:
+            range_left, range_right = error_range
+            base_degree = base_direction * 90
+            left = (base_degree - range_left) % 360
+            right = (base_degree + range_right) % 360
+
+            if base_direction == self.CHAR_DIRECTION_UP:
+                if (left <= target_degree or target_degree <= right):
+                    return DIRECTION_NONE
+
+            else:
+                if (left <= target_degree and target_degree <= right):
+                    return DIRECTION_NONE
+
+            # (target_degree < left and target_degree > right):
+            left_diff = left - target_degree
+            right_diff = right - target_degree
+
+            return DIRECTION_RIGHT if abs(right_diff) > abs(left_diff) else DIRECTION_LEFT
+
+        frame = frame.copy()
+        idx, name, proba = right_info
+        box = hand_result.get_box_array()[idx].tolist()
+
+        direction_info, (start_idx, end_idx) = self.CHAR_CORRECTION_INFO_DICT.get(target_char)
+        abs_points = hand_result.get_abs_landmark_array()[idx, :, :2].astype(np.int32)
+        landmarks = hand_result.get_landmark_array()[idx]
+        start_landmark, end_landmark = abs_points[start_idx].tolist(), abs_points[end_idx].tolist()
+        # 모든 손, 모든 보정 쌍의 각도는 결과마다 한번만 계산됨
+        degrees = hand_result.get_pair_degree_array(self._correction_pairs)
+        target_degree = int(degrees[idx, self._correction_pair_index[target_char]])
+        logging.debug(f"target_degree : {target_degree}")
+
+        direction = get_direction_(direction_info, target_degree, (10, 10))
+        logging.debug(f"direction : {direction}")
+
+
+        # 차이가 0이라면 성공 0이 아니라면 보정
+        color = self.COLOR_ORENGE if not direction else self.COLOR_RED
+        frame = self.draw_box(frame, box, color)
+        frame = self.draw_landmark(frame, landmarks)
+        # 대상이 되는 라인을 그림
+        frame = self.draw_line(frame, start_landmark, end_landmark, self.COLOR_ORENGE, 6)
+        frame = self.draw_text(frame, name, (box[0], box[1] - 35), color)
+        self.front_draw(frame)
+
+        if direction == DIRECTION_NONE:
+            self._observer.on_direction(DIRECTION_NONE)
+
+        else:
+            if self.mirror_mode == False:
+                direction = DIRECTION_LEFT if direction == DIRECTION_RIGHT else DIRECTION_RIGHT
+
+            if direction == DIRECTION_LEFT:
+                self._observer.on_direction(DIRECTION_LEFT)
+            else:
+                self._observer.on_direction(DIRECTION_RIGHT)
+
+        return False if direction else True
+
+    def get_right_hand_info(self, hand_result : HandResult, predict_result : tuple, target_char : str) -> tuple:
+        is_always_enter = False if target_char in self.CHAR_EXCEPTION_LIST else True
+
+        target_hand_label = "Right" if self.mirror_mode else "Left"
+        hand_labels = hand_result.get_labels()
+        for idx, (hand_label, (name, proba)) in enumerate(zip(hand_labels, predict_result)):
+            if is_always_enter or hand_label == target_hand_label:
+                return idx, name, proba
+
+        return tuple()
+
+    def display_draw_wrapper(self, frame : np.ndarray, box : tuple, landmarks : list, name : str, color : tuple):
+        frame = self.draw_box(frame, box, color)
+        frame = self.draw_landmark(frame, landmarks)
+        frame = self.draw_text(frame, name, (box[0], box[1] - 35), color)
+        self.front_draw(frame)
+
+    def check_char(self, target_char : str) -> bool:
+        start_time = float()
+        DURATION_TIME = 1.5
+        self.answer_fail()
+        while self.is_events_set() == False:
+            result = self.until_predict(target_char)
+            if not start_time:
+                start_time = time.time()
+
+            frame, (hand_result, predict_result, right_info) = result
+            idx, name, proba = right_info
+            box = hand_result.get_box_array()[idx].tolist()
+            landmarks = hand_result.get_landmark_array()[idx]
+
+            # 여기서부턴 보정의 영역이므로 프로세싱으로 표기
+            self.answer_processing()
+
+            if self.check_char_pt(target_char, frame, box) == False:
+                start_time = time.time()
+                continue
+            
+            # 각도를 체크
+            direction = self.check_direction(target_char, frame, hand_result, right_info)
+
+            # 방향이 방향을 수정해야한다면...
+            if not direction:
+                start_time = time.time()
+                continue
+
+            # 정답 유지시간이 일정 시간 미만이라면 통과시키지 않음
+            if time.time() - start_time < DURATION_TIME:
+                self.display_draw_wrapper(frame, box, landmarks, name, self.COLOR_ORENGE)
+                continue
+
+            self.display_draw_wrapper(frame, box, landmarks, name, self.COLOR_GREEN)
+            self.answer_success()
+
+            # 이전 정보를 기억
+            self._pre_target_char = name
+            self._pre_target_char_box = tuple(box)
+
+            return True
+
+        return False
+
+    def check_question(self, question_info : dict) -> bool:
+        question = question_info["question"]
+        answer = question_info["answer"]
+        remaining_time = question_info["time"]
+        level = question_info["level"]
+
+        self._observer.on_process(PROCESS_QUESTION, {"question" : question})
+        self._observer.on_process(PROCESS_TIME, {"time" : remaining_time})
+        self._observer.on_process(PROCESS_LEVEL, {"level" : level})
+
+        answer_idx = 0
+        answer_len = len(answer)
+        
+        start_time = float()
+
+        # 이전 입력 정보 지움
+        self._pre_target_char = ""
+        self._pre_target_char_box = None
+        DURATION_TIME = 1.5
+        while answer_idx < answer_len and self.is_events_set() == False:
+            target_char = answer[answer_idx]
+            self._observer.on_process(PROCESS_NEXT_CHAR, {"next_char" : target_char})
+            result = self.until_predict(target_char)
+            if not start_time:
+                start_time = time.time()
+
+            frame, (hand_result, predict_result, right_info) = result
+            idx, name, proba = right_info
+            box = hand_result.get_box_array()[idx].tolist()
+            landmarks = hand_result.get_landmark_array()[idx]
+
+            if self.check_char_pt(target_char, frame, box) == False:
+                start_time = time.time()
+                continue
+            
+            # 정답 유지시간이 일정 시간 미만이라면 통과시키지 않음
+            if time.time() - start_time < DURATION_TIME:
+                self.display_draw_wrapper(frame, box, landmarks, name, self.COLOR_ORENGE)
+                continue
+
+            self.display_draw_wrapper(frame, box, landmarks, name, self.COLOR_GREEN)
+            self.sleep(1.5)
+
+            # 이전 정보를 기억
+            self._pre_target_char = name
+            self._pre_target_char_box = tuple(box)
+
+            answer_idx += 1
+            start_time = float()
+
+        return True
+
+
+    def sleep(self, timeout : float) -> None:
+        start_time = time.time()
+        while time.time() - start_time < timeout:
+            self.is_events_set()
+            time.sleep(0.02)
+
+        return
+
+    def study_proc(self) -> None:
+        while not self.is_exit_set():
+            
+            if self._stop_event.is_set():
+                time.sleep(0.3)
+                continue
+            
+            questions = self.questions
+            questions_len = len(questions)
+            question_idx = 0
+
+            while question_idx < questions_len and self.is_events_set() == False:
+                target_char = questions[question_idx]
+                predict_result = self.check_char(target_char)
+                if not predict_result:
+                    continue
+                
+                question_idx += 1
+                self.sleep(1)
+
+            self._pre_target_char = ""
+            self._pre_target_char_box = None
+            self.stop_work()
+
+    def test_proc(self) -> None:
+        while not self.is_events_set():
+            frame, _ = self.next_result(self._front_channel, None)
+            self.front_draw(frame)
+
+            questions = self.questions
+            if not questions:
+                continue
+            
+            random.shuffle(questions)
+            questions_len = len(questions)
+            questions_idx = 0
+
+            self._observer.on_process(PROCESS_DATA, {"questions" : questions})
+
+            while questions_idx < questions_len and self.is_events_set() == False:
+                question_info = questions[questions_idx]
+                try:
+                    is_success = self.check_question(question_info)
+                except NextExecption:
+                    self._next_event.clear()
+                    is_success = False
+
+                if is_success:
+                    self._observer.on_process(PROCESS_SUCCESS, dict())
+                else:
+                    self._observer.on_process(PROCESS_FAIL, dict())
+
+                questions_idx += 1
+
+            self.stop_work()
+
+    def run(self) -> None:
+        self._detectors = self._service.borrow(self.MAX_NUM_HANDS)
+        self._front_channel.classifier = self._detectors.front
+        self._side_channel.classifier = self._detectors.side
+
+        self._pipeline.start()
+        try:
+            self.run_proc()
+        finally:
+            self._pipeline.join()
+            self._service.give_back(self._detectors)
+            self._detectors = None
+
+    def run_proc(self) -> None:
+        while self._exit_event.is_set() == False:
+            try:
+
+                if self._run_mode == RUN_STUDY:
+                    self.study_proc()
+                elif self._run_mode == RUN_TEST:
+                    self.test_proc()
+
+            except (ExitException, SourceEndException):
+                break
+            except StopException:
+                pass
+            except DataModifyExecption:
+                self._question_modify_event.clear()
+
+
+if __name__ == "__main__":
+    # 화면 없이 정면 카메라로 학습 모드를 돌려보고 단계별 통계를 출력
+    class PrintObserver(EngineObserver):
+        def on_answer(self, code : int) -> None:
+            print(f"answer : {code}")
+
+    logging.basicConfig(level=logging.INFO)
+    camera = FrameCapture(cv2.VideoCapture(0), "front_capture")
+    camera.start()
+
+    engine = RecognitionEngine((camera, camera), RUN_STUDY, PrintObserver(), render = False)
+    engine.questions = "ㄱ"
+    engine.start()
+    try:
+        while engine.is_alive():
+            time.sleep(1)
+            print(engine.pipeline_stats)
+            print(engine.gate_stats)
+    except KeyboardInterrupt:
+        pass
+
+    engine.join()
+    camera.release()
@@ -5,26 +5,46 @@ import cv2
 import numpy as np
 from PySide6.QtCore import QSize, Slot, Signal, QObject
 from PySide6.QtWidgets import QDialog, QMessageBox
-from PySide6.QtGui import QPixmap, QColor, QCloseEvent
+from PySide6.QtGui import QPixmap, QColor, QCloseEvent, QResizeEvent
 
 from .form.camera_form import Ui_Dialog
-from .utils import numpy_to_pixmap
+from .utils import FrameSignal
+from ..capture import FrameCapture
+from ..camera_source import open_source
+from ..startup import profiler
 
 CAMERA_SIGNAL_FAIL = 0
 CAMERA_SIGNAL_FRONT = 1
 CAMERA_SIGNAL_SIDE = 2
 
+CAMERA_DIALOG_WAIT_SECTION = "camera dialog (wait)"
+
 class CameraSignal(QObject):
+    """카메라별 FrameSignal로 프레임을 넘기고 GUI 스레드에서 (코드, QPixmap)으로 알림
+    """
     pixmap_signal = Signal(int, QPixmap)
+    _fail_signal = Signal()
+
+    def __init__(self):
+        super().__init__()
+        self.front_signal = FrameSignal()
+        self.side_signal = FrameSignal()
+        self.front_signal.sig.connect(lambda pixmap : self.pixmap_signal.emit(CAMERA_SIGNAL_FRONT, pixmap))
+        self.side_signal.sig.connect(lambda pixmap : self.pixmap_signal.emit(CAMERA_SIGNAL_SIDE, pixmap))
+        self._fail_signal.connect(lambda : self.pixmap_signal.emit(CAMERA_SIGNAL_FAIL, QPixmap()))
 
-    def front(self, pixmap):
-        self.pixmap_signal.emit(CAMERA_SIGNAL_FRONT, pixmap)
+    def set_sizes(self, front_size : tuple[int, int], side_size : tuple[int, int]) -> None:
+        self.front_signal.set_size(front_size)
+        self.side_signal.set_size(side_size)
 
-    def side(self, pixmap):
-        self.pixmap_signal.emit(CAMERA_SIGNAL_SIDE, pixmap)
+    def front(self, img : np.ndarray):
+        self.front_signal.send(img)
+
+    def side(self, img : np.ndarray):
+        self.side_signal.send(img)
 
     def fail(self):
-        self.pixmap_signal.emit(CAMERA_SIGNAL_FAIL, QPixmap())
+        self._fail_signal.emit()
 
 
 class CaptureThread(Thread):
@@ -46,11 +66,11 @@ class CaptureThread(Thread):
     def sleep_(self, timeout : float):
         self.exit_event.wait(timeout)
 
-    def send_front(self, pixmap : QPixmap):
-        self.camera_signal.front(pixmap)
+    def send_front(self, img : np.ndarray):
+        self.camera_signal.front(img)
 
-    def send_side(self, pixmap : QPixmap):
-        self.camera_signal.side(pixmap)
+    def send_side(self, img : np.ndarray):
+        self.camera_signal.side(img)
 
     def send_fail(self):
         self.camera_signal.fail()
@@ -65,8 +85,8 @@ class CaptureThread(Thread):
                     continue
 
                 success, frame = camera.read()
-                pixmap = numpy_to_pixmap(frame) if success else QPixmap()
-                proc(pixmap)
+                if success:
+                    proc(frame)
 
             self.camera_change_lock.release()
 
@@ -81,13 +101,19 @@ class CaptureThread(Thread):
     
 
 class CameraDialog(QDialog, Ui_Dialog):
-    def __init__(self):
+    """sources : (정면, 측면) 카메라 소스, 장치 번호, 동영상 파일, 이미지 폴더 또는 CameraSource
+    """
+    DEFAULT_SOURCES = (0, 1)
+
+    def __init__(self, sources : tuple = None):
         super(CameraDialog, self).__init__()
+        self.sources = sources or self.DEFAULT_SOURCES
         self.setupUi(self)
         self.init_handler()
         self.init_data()
         self.check_camera()
-        self.exec()
+        with profiler.section(CAMERA_DIALOG_WAIT_SECTION):
+            self.exec()
 
     def __del__(self):
         self.front_camera.release()
@@ -102,21 +128,23 @@ class CameraDialog(QDialog, Ui_Dialog):
         self.camera_change_button.clicked.connect(self.camera_change_button_handler)
 
     def init_data(self) -> None:
-        self.front_camera = cv2.VideoCapture(0)
-        self.side_camera = cv2.VideoCapture(1)
+        # 카메라마다 캡쳐 스레드가 최신 프레임 1개만 보관, 미리보기와 추론은 여기서 프레임을 가져감
+        front_source, side_source = self.sources
+        self.front_camera = FrameCapture(open_source(front_source), "front_capture")
+        self.side_camera = FrameCapture(open_source(side_source), "side_capture")
+        self.front_camera.start()
+        self.side_camera.start()
         self.camera_signal = CameraSignal()
         self.camera_signal.pixmap_signal.connect(self.camera_signal_handler)
+        self.update_preview_size()
         self.capture_thread = CaptureThread((self.front_camera, self.side_camera), self.camera_signal)
         self.capture_thread.start()
 
     def dispose_data(self) -> None:
         self.capture_thread.join()
 
-        if self.front_camera.isOpened():
-            self.front_camera.release()
-
-        if self.side_camera.isOpened():
-            self.side_camera.release()
+        self.front_camera.release()
+        self.side_camera.release()
 
     def check_camera(self) -> bool:
         title = "{} 카메라가 없습니다"
@@ -145,10 +173,21 @@ class CameraDialog(QDialog, Ui_Dialog):
 
         return True
 
-    def front(self) -> cv2.VideoCapture:
+    def update_preview_size(self) -> None:
+        # 미리보기는 캡쳐 스레드에서 라벨 크기로 줄여서 넘김
+        self.camera_signal.set_sizes(self.front_camera_img_label.size().toTuple()
+                                    , self.side_camera_img_label.size().toTuple())
+
+    def resizeEvent(self, arg__1: QResizeEvent) -> None:
+        if hasattr(self, "camera_signal"):
+            self.update_preview_size()
+
+        return super().resizeEvent(arg__1)
+
+    def front(self) -> FrameCapture:
         return self.front_camera
 
-    def side(self) -> cv2.VideoCapture:
+    def side(self) -> FrameCapture:
         return self.side_camera if self.side_camera.isOpened() else self.front_camera
 
     def cameras(self) -> tuple:
@@ -159,13 +198,17 @@ class CameraDialog(QDialog, Ui_Dialog):
         if code == CAMERA_SIGNAL_FAIL:
             pass
         elif code == CAMERA_SIGNAL_FRONT:
-            size = self.front_camera_img_label.size()
-            pixmap = pixmap.scaled(size)
-            self.front_camera_img_label.setPixmap(pixmap)
+            self.set_preview(self.front_camera_img_label, pixmap)
         elif code == CAMERA_SIGNAL_SIDE:
-            size = self.side_camera_img_label.size()
+            self.set_preview(self.side_camera_img_label, pixmap)
+
+    def set_preview(self, label, pixmap : QPixmap) -> None:
+        # 크기를 바꾸는 중에 도착한 프레임만 다시 맞춤
+        size = label.size()
+        if pixmap.size() != size:
             pixmap = pixmap.scaled(size)
-            self.side_camera_img_label.setPixmap(pixmap)
+
+        label.setPixmap(pixmap)
 
     @Slot()
     def ok_button_handler(self) -> None:
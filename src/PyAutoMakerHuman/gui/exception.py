@@ -18,5 +18,10 @@ class DataModifyExecption(Exception):
         super().__init__(*args)
 
 class NextExecption(Exception):
+    def __init__(self, *args: object) -> None:
+        super().__init__(*args)
+
+
+class SourceEndException(Exception):
     def __init__(self, *args: object) -> None:
         super().__init__(*args)
\ No newline at end of file
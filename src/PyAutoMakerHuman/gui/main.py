@@ -1,21 +1,29 @@
 import sys
 from threading import Thread, Event
 
-from PySide6.QtCore import Slot, Signal, QObject
+from PySide6.QtCore import Slot, Signal, QObject, QTimer
 from PySide6.QtWidgets import QMainWindow, QApplication, QFrame, QStackedLayout
 from PySide6.QtGui import QPixmap
-from qt_material import apply_stylesheet
 
 from .form.main_form import Ui_MainWindow
-from .study import StudyWindow
-from .test import TestWindow
-from .camera import CameraDialog
-from .conversation import ConversationWindow
+from .camera import CameraDialog, CAMERA_DIALOG_WAIT_SECTION
+from ..startup import WarmUp, profiler
+
+
+def preload_engine() -> None:
+    from ..engine import RecognitionEngine
+    from ..inference import get_service
+    service = get_service()
+    service.preload(RecognitionEngine.MAX_NUM_HANDS)
+    # 학습으로 모델 폴더가 바뀌면 백그라운드에서 다시 불러옴
+    service.start_watch()
+
 
 class MainWindow(QMainWindow, Ui_MainWindow):
 
-    def __init__(self):
+    def __init__(self, sources : tuple = None):
         super(MainWindow, self).__init__()
+        self.sources = sources
         self.setupUi(self)
 
         self.init_handler()
@@ -28,7 +36,13 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.mirror_mode_button.clicked.connect(self.mirror_mode_button_handler)
 
     def init_display(self) -> None:
-        self.camera_dialog = CameraDialog()
+        self.camera_dialog = CameraDialog(self.sources)
+
+        # 엔진(mediapipe, 모델)을 쓰는 창은 카메라 선택 창이 떠있는 동안 WarmUp에서 미리 불러옴
+        from .study import StudyWindow
+        from .test import TestWindow
+        #from .conversation import ConversationWindow
+
         self.study_frame = StudyWindow(self, self.camera_dialog.cameras())
         self.test_frame = TestWindow(self, self.camera_dialog.cameras())
         #self.conversation_frame = ConversationWindow(self, self.camera_dialog.cameras())
@@ -68,12 +82,21 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         text = "거울모드 {}".format("On" if target_frame.mirror_mode else "Off")
         self.mirror_mode_button.setText(text)
 
-def start_main():
-    app = QApplication(sys.argv)
-    apply_stylesheet(app, theme='dark_teal.xml')
-    window = MainWindow()
-    window.show()
-    app.exec()
+def start_main(sources : tuple = None, profile_startup : bool = False):
+    """sources : (정면, 측면) 카메라 소스, 없으면 장치 0, 1
+    profile_startup : 메인 창이 뜨면 시작 시간 보고서를 출력 (카메라 선택을 기다린 시간은 제외)
+    """
+    from qt_material import apply_stylesheet
+
+    with profiler.section("main window"):
+        app = QApplication(sys.argv)
+        apply_stylesheet(app, theme='dark_teal.xml')
+        warm_up = WarmUp(preload = preload_engine)
+        warm_up.start()
+        window = MainWindow(sources)
+        window.show()
 
-if __name__ == "__main__":
-    start_main()
+    if profile_startup:
+        QTimer.singleShot(0, lambda : print(profiler.report((CAMERA_DIALOG_WAIT_SECTION,)), flush = True))
+
+    app.exec()
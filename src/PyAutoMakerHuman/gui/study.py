@@ -86,6 +86,7 @@ class StudyWindow(QFrame, Ui_Frame):
                                             
         self._study_thread.mirror_mode = self.mirror_mode
         self._study_thread.questions = self._questions
+        self._study_thread.set_front_draw_size(self.screen_img_label.size().toTuple())
         self._study_thread.start()
 
     def dispose_data(self) -> None:
@@ -161,6 +162,9 @@ class StudyWindow(QFrame, Ui_Frame):
         pixmap = pixmap.scaled(width, height)
         self.study_img_label.setPixmap(pixmap)
 
+        if self._study_thread:
+            self._study_thread.set_front_draw_size(self.screen_img_label.size().toTuple())
+
         return super().resizeEvent(event)
 
     @property
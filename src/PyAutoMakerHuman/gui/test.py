@@ -3,7 +3,7 @@ import numpy as np
 
 from PySide6.QtCore import Slot, QTimer
 from PySide6.QtWidgets import QFrame
-from PySide6.QtGui import QHideEvent, QShowEvent, QPixmap, QColor
+from PySide6.QtGui import QHideEvent, QShowEvent, QResizeEvent, QPixmap, QColor
 
 from . import proc
 from .utils import draw_pixmap, load_shape_img_info, load_question_info, numpy_to_pixmap, draw_char_img
@@ -33,6 +33,7 @@ class TestWindow(QFrame, Ui_Frame):
                                             , process_handler = self.process_handler)
 
         self._test_thread.mirror_mode = self.mirror_mode
+        self._test_thread.set_front_draw_size(self.screen_img_label.size().toTuple())
         self._test_thread.stop_work()
         self._test_thread.start()
 
@@ -132,6 +133,12 @@ class TestWindow(QFrame, Ui_Frame):
         self.dispose_data()
         return super().hideEvent(event)
 
+    def resizeEvent(self, event: QResizeEvent) -> None:
+        if self._test_thread:
+            self._test_thread.set_front_draw_size(self.screen_img_label.size().toTuple())
+
+        return super().resizeEvent(event)
+
     @property
     def mirror_mode(self) -> bool:
         return self._mirror_mode
@@ -1,9 +1,9 @@
 import os
 import json
 import time
-import math
 import functools
 import logging
+from threading import Lock
 from typing import Any, Callable
 
 
@@ -11,11 +11,13 @@ import cv2
 import numpy as np
 
 
+from PySide6.QtCore import QObject, Signal, Slot, Qt
 from PySide6.QtWidgets import QLabel
 from PySide6.QtGui import QPixmap, QImage
 
 from . import datas_dir
 from ..image import cv2_imread, cv2_putText
+from ..hand import get_pair_degrees
 
 
 def draw_pixmap(target_img_label : QLabel, pixmap : QPixmap) -> None:
@@ -32,13 +34,74 @@ def draw_char_img(target_img_label : QLabel, char : str, font_scale = 20) -> Non
     pixmap = numpy_to_pixmap(img)
     target_img_label.setPixmap(pixmap)
 
-def numpy_to_pixmap(img : np.ndarray) -> QPixmap:
+def numpy_to_qimage(img : np.ndarray, size : tuple[int, int] = None) -> QImage:
+    """BGR 이미지를 버퍼를 직접 가지는 QImage로 변환, size(w, h)가 있다면 그 크기로 줄임
+    QImage의 메모리에 바로 resize(또는 복사)하므로 다른 스레드로 넘겨도 안전함
+    크기가 0 이하면(화면에 아직 배치되지 않은 라벨 등) 빈 QImage를 리턴
+    """
     h, w, c = img.shape
+    dst_w, dst_h = size if size else (w, h)
+    if dst_w <= 0 or dst_h <= 0:
+        return QImage()
+
     if c == 4:
         img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
-    qimg = QImage(img.data, w, h, 3 * w, QImage.Format_BGR888)
-    pixmap = QPixmap(qimg)
-    return pixmap
+
+    qimg = QImage(dst_w, dst_h, QImage.Format_BGR888)
+    # 줄 끝이 4바이트 정렬로 채워질 수 있으므로 줄 단위 간격으로 봄
+    buffer = np.frombuffer(qimg.bits(), np.uint8).reshape(dst_h, qimg.bytesPerLine())
+    dst = buffer[:, :dst_w * 3].reshape(dst_h, dst_w, 3)
+
+    if (dst_w, dst_h) == (w, h):
+        dst[:] = img
+    elif qimg.bytesPerLine() == dst_w * 3:
+        cv2.resize(img, (dst_w, dst_h), dst, interpolation = cv2.INTER_AREA)
+    else:
+        dst[:] = cv2.resize(img, (dst_w, dst_h), interpolation = cv2.INTER_AREA)
+
+    return qimg
+
+def numpy_to_pixmap(img : np.ndarray) -> QPixmap:
+    return QPixmap.fromImage(numpy_to_qimage(img))
+
+
+class FrameSignal(QObject):
+    """작업 스레드의 프레임을 GUI 스레드로 넘기는 시그널
+    작업 스레드에서 표시할 크기로 줄인 QImage를 만들고 QPixmap 변환은 GUI 스레드에서 한번만 함
+    GUI 스레드가 아직 가져가지 않은 프레임은 최신 프레임 1개로 덮어쓰므로 이벤트 큐에 프레임이 쌓이지 않음
+    GUI 스레드에서 만들어야 함
+    """
+    sig = Signal(QPixmap)
+    _ready = Signal()
+
+    def __init__(self, size : tuple[int, int] = None):
+        super().__init__()
+        self._lock = Lock()
+        self._pending : QImage = None
+        self._size = size
+        self._ready.connect(self._deliver, Qt.QueuedConnection)
+
+    def set_size(self, size : tuple[int, int] or None) -> None:
+        """표시할 크기(w, h), None이면 원본 크기
+        """
+        self._size = size
+
+    def send(self, img : np.ndarray) -> None:
+        qimg = numpy_to_qimage(img, self._size)
+        with self._lock:
+            scheduled = self._pending is not None
+            self._pending = qimg
+
+        if not scheduled:
+            self._ready.emit()
+
+    @Slot()
+    def _deliver(self) -> None:
+        with self._lock:
+            qimg, self._pending = self._pending, None
+
+        if qimg is not None:
+            self.sig.emit(QPixmap.fromImage(qimg))
 
 def time_check(func) -> Callable:
     @functools.wraps(func)
@@ -87,11 +150,5 @@ def load_question_info() -> list[dict]:
 
 
 def get_degree(start : tuple[int, int], end : tuple[int, int]):
-    start_x, start_y = start
-    end_x, end_y = end
-    dx = end_x - start_x
-    dy = end_y - start_y
-    degree = math.atan2(dy, dx) * (180.0 / math.pi) + 90
-    degree = degree + 360 if degree < 0 else degree
-
-    return int(degree)
\ No newline at end of file
+    landmarks = np.array([[start, end]], dtype=np.float64)
+    return int(get_pair_degrees(landmarks, ((0, 1),))[0, 0])
\ No newline at end of file
@@ -1,17 +1,22 @@
 import os
-import math
 import logging
+import multiprocessing
 from glob import glob
+from collections import Counter
+from functools import lru_cache
 
-import imutils
 import numpy as np
 import cv2
-import mediapipe as mp
-from .image import cv2_imread
+from .image import cv2_imread, cv2_imwrite
+
+
+@lru_cache(maxsize = 1)
+def get_mp_solutions():
+    """mediapipe는 import에 오래 걸려서 검출기를 처음 만들 때 불러옴
+    """
+    import mediapipe as mp
+    return mp.solutions
 
-mp_drawing = mp.solutions.drawing_utils
-mp_drawing_styles = mp.solutions.drawing_styles
-mp_hands = mp.solutions.hands
 
 HAND_DISTANCE_NONE = 0
 HAND_DISTANCE_UP = 1
@@ -19,61 +24,300 @@ HAND_DISTANCE_DOWN = 2
 HAND_DISTANCE_LEFT = 3
 HAND_DISTANCE_RIGHT = 4
 
+#손목, 손바닥과 중지가 만나는 지점
+#추후에 정확한 이름으로 수정
+HAND_DEGREE_PAIR = (0, 9)
+
+
+def get_pair_degrees(landmarks : np.ndarray, pairs : np.ndarray) -> np.ndarray:
+    """모든 손과 모든 랜드마크 쌍(start_idx, end_idx)의 각도를 한번에 계산하는 함수
+    landmarks : (손 갯수, 21, 2 이상), pairs : (쌍 갯수, 2)
+    리턴 : (손 갯수, 쌍 갯수) int32, 위쪽이 0도이고 시계방향으로 증가
+    """
+    landmarks = np.asarray(landmarks)
+    pairs = np.asarray(pairs, dtype=np.intp).reshape(-1, 2)
+
+    start = landmarks[:, pairs[:, 0], :2].astype(np.float64)
+    end = landmarks[:, pairs[:, 1], :2].astype(np.float64)
+    delta = end - start
+    degrees = np.degrees(np.arctan2(delta[..., 1], delta[..., 0])) + 90
+    degrees[degrees < 0] += 360
+
+    return degrees.astype(np.int32)
+
+
+def degrees_to_directions(degrees : np.ndarray) -> np.ndarray:
+    """각도 배열을 HAND_DISTANCE_* 방향 배열로 양자화하는 함수
+    """
+    degrees = np.asarray(degrees)
+    conditions = [((degrees > 315) & (degrees <= 360)) | ((degrees > 0) & (degrees <= 45))
+                , (degrees > 45) & (degrees <= 135)
+                , (degrees > 135) & (degrees <= 225)]
+    choices = [HAND_DISTANCE_UP, HAND_DISTANCE_RIGHT, HAND_DISTANCE_DOWN]
+
+    return np.select(conditions, choices, HAND_DISTANCE_LEFT)
+
+
+def mirror_features(datas : np.ndarray) -> np.ndarray:
+    """박스 기준 정규좌표 데이터((n, 63) 또는 (63,))를 좌우 반전하는 함수
+    이미지를 좌우 반전하고 다시 추출한 것과 같음 (박스 안에서 x -> 1 - x)
+    """
+    datas = np.array(datas, dtype=np.float32)
+    shape = datas.shape
+    landmarks = datas.reshape(-1, 21, 3)
+    landmarks[..., 0] = 1 - landmarks[..., 0]
+
+    return landmarks.reshape(shape)
+
+
+# 거울모드에서도 반전하지 않는 글자, 좌우 방향 자체가 글자를 구분하는 수형
+MIRROR_EXCEPT_LIST = ("ㅓ", "ㅕ", "ㅔ", "ㅖ")
+
+
+# 손 뼈대를 이어서 그릴 수 있는 랜드마크 경로, 각 경로는 cv2.polylines 선 1개
+HAND_BONE_PATHS = ((0, 1, 2, 3, 4), (0, 5, 6, 7, 8), (5, 9, 13, 17), (9, 10, 11, 12)
+                    , (13, 14, 15, 16), (17, 18, 19, 20), (0, 17))
+
+
+@lru_cache(maxsize = 8)
+def get_joint_sprite(radius : int) -> np.ndarray:
+    """cv2.circle(채움)로 그린 원의 픽셀 오프셋 (픽셀 갯수, 2[x, y])
+    정수 중심에서는 원의 모양이 항상 같으므로 한번만 그려서 찍어냄
+    """
+    size = radius * 2 + 1
+    canvas = np.zeros((size, size), dtype=np.uint8)
+    cv2.circle(canvas, (radius, radius), radius, 255, -1)
+    offsets = np.argwhere(canvas)[:, ::-1] - radius
+    offsets.flags.writeable = False
+
+    return offsets
+
+
+def draw_landmark_overlay(img : np.ndarray, landmarks : np.ndarray
+                            , bone_color : tuple = (255, 255, 255), bone_thickness : int = 2
+                            , joint_color : tuple = (255, 0, 0), joint_radius : int = 6) -> np.ndarray:
+    """정규좌표 랜드마크((손 갯수, 21, 2 이상) 또는 (21, 2 이상))를 img에 바로 그리는 함수
+    모든 손의 좌표를 한번에 픽셀 좌표로 바꾸고 뼈대는 cv2.polylines 1번, 관절은 원 스프라이트를 찍어서 그림
+    손이 여러개면 모든 뼈대를 그린 후 관절을 그림
+    """
+    landmarks = np.asarray(landmarks)
+    if landmarks.size == 0:
+        return img
+
+    h, w = img.shape[:2]
+    points = (landmarks.reshape(-1, 21, landmarks.shape[-1])[..., :2].astype(np.float64) * (w, h)).astype(np.int32)
+
+    cv2.polylines(img, [hand_points[list(path)] for hand_points in points for path in HAND_BONE_PATHS]
+                    , False, bone_color, bone_thickness)
+
+    # 원이 이미지 안에 다 들어가는 관절은 1차원 인덱스로 한번에 찍고, 가장자리에 걸친 관절만 cv2.circle로 그림
+    joints = points.reshape(-1, 2)
+    inside = (joints[:, 0] >= joint_radius) & (joints[:, 0] < w - joint_radius) \
+            & (joints[:, 1] >= joint_radius) & (joints[:, 1] < h - joint_radius)
+
+    if img.ndim == 3 and img.flags.c_contiguous:
+        sprite = get_joint_sprite(joint_radius)
+        centers = joints[inside]
+        pixels = ((centers[:, 1] * w + centers[:, 0])[:, None] + (sprite[:, 1] * w + sprite[:, 0])).ravel()
+        flat_img = img.reshape(-1, img.shape[2])
+        for channel, value in enumerate(joint_color[:img.shape[2]]):
+            flat_img[pixels, channel] = value
+    else:
+        inside[:] = False
+
+    for x, y in joints[~inside].tolist():
+        cv2.circle(img, (x, y), joint_radius, joint_color, -1)
+
+    return img
+
+
 class HandResult:
+    # True로 설정하면 파생값(절대좌표, 박스 등)의 계산 횟수를 기록
+    debug = False
+
     def __init__(self, img_shape : tuple, result):
         self.height :int = img_shape[0]
         self.width : int = img_shape[1]
         self.channel : int = img_shape[2]
 
         self.results = result
+        # protobuf는 한번만 순회해서 배열로 변환
+        # norm_landmarks : (손 갯수, 21, 3) float32
+        self.norm_landmarks, self.handedness, self.handedness_scores = self.results_to_arrays(result)
+        self.norm_landmarks.setflags(write=False)
+
+        # 파생값 캐시, 이미지 크기가 바뀔 때만 무효화
+        self._cache = dict()
+        self._cache_shape = self.img_shape
+        self.compute_count = Counter()
 
     def __del__(self):
         pass
 
+    def __getstate__(self) -> dict:
+        # protobuf 원본은 직렬화하지 않음 (프로세스간 전달용)
+        state = self.__dict__.copy()
+        state["results"] = None
+        state["_cache"] = dict()
+        return state
+
+    @classmethod
+    def from_arrays(cls, img_shape : tuple, landmarks : np.ndarray, labels : list,
+                    scores : np.ndarray = None) -> "HandResult":
+        """배열로부터 HandResult를 만드는 함수, mediapipe 원본 결과(results)는 None
+        landmarks : (손 갯수, 21, 3) 정규좌표
+        """
+        hand_result = cls(img_shape, None)
+        hand_result.norm_landmarks = np.array(landmarks, dtype=np.float32).reshape(-1, 21, 3)
+        hand_result.norm_landmarks.setflags(write=False)
+        hand_result.handedness = np.asarray(labels, dtype="<U5").reshape(-1)
+        hand_result.handedness_scores = (np.ones(len(hand_result.handedness), np.float32) if scores is None
+                                            else np.asarray(scores, dtype=np.float32).reshape(-1))
+
+        return hand_result
+
+    def map_from_roi(self, img_shape : tuple, roi : tuple) -> "HandResult":
+        """잘라낸 영역 roi(x1, y1, x2, y2)에서 검출한 결과를 img_shape 전체 프레임 기준 결과로 변환
+        z는 mediapipe처럼 가로 크기 기준이라 가로 비율만큼 줄임
+        """
+        x1, y1, x2, y2 = roi
+        h, w = img_shape[:2]
+        landmarks = self.norm_landmarks.copy()
+        landmarks[..., 0] = (x1 + landmarks[..., 0] * (x2 - x1)) / w
+        landmarks[..., 1] = (y1 + landmarks[..., 1] * (y2 - y1)) / h
+        landmarks[..., 2] *= (x2 - x1) / w
+
+        return HandResult.from_arrays(img_shape, landmarks, self.handedness, self.handedness_scores)
+
+    @property
+    def img_shape(self) -> tuple:
+        return self.height, self.width, self.channel
+
+    def set_img_shape(self, img_shape : tuple) -> None:
+        """기준 이미지 크기를 변경하는 함수, 크기가 바뀌면 캐시가 무효화 됨
+        """
+        self.height, self.width, self.channel = img_shape[:3]
+
+    def cached(self, key, compute_func):
+        """파생값을 한번만 계산하고 캐시해서 리턴하는 함수
+        리턴되는 배열은 읽기 전용
+        """
+        if self._cache_shape != self.img_shape:
+            self._cache.clear()
+            self._cache_shape = self.img_shape
+
+        if key in self._cache:
+            return self._cache[key]
+
+        value = compute_func()
+        if isinstance(value, np.ndarray):
+            value.setflags(write=False)
+
+        self._cache[key] = value
+        if self.debug:
+            self.compute_count[key] += 1
+            logging.debug(f"[HandResult] : compute {key} ({self.compute_count[key]})")
+
+        return value
+
+    def get_compute_count(self) -> dict:
+        """디버그 모드에서 파생값별 계산 횟수를 리턴하는 함수
+        """
+        return dict(self.compute_count)
+
+    @staticmethod
+    def results_to_arrays(result) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """mediapipe의 결과를 (랜드마크, 손 라벨, 손 스코어) 배열로 변환하는 함수
+        """
+        if result is None or result.multi_handedness is None:
+            return (np.empty((0, 21, 3), np.float32), np.empty(0, dtype="<U5")
+                    , np.empty(0, np.float32))
+
+        landmarks = np.array([[(landmark.x, landmark.y, landmark.z) for landmark in hand_landmark.landmark]
+                                for hand_landmark in result.multi_hand_landmarks], dtype=np.float32)
+        labels = np.array([info.classification[0].label for info in result.multi_handedness], dtype="<U5")
+        scores = np.array([info.classification[0].score for info in result.multi_handedness], dtype=np.float32)
+
+        return landmarks, labels, scores
+
     def count(self) -> int:
         """발견된 손의 갯수를 리턴하는 함수
         """
-        if self.results.multi_handedness is None:
-            return 0
-
-        return len(self.results.multi_handedness)
+        return len(self.handedness)
 
     def scores(self) -> list:
         """발견된 손의 스코어를 리턴하는 함수
         """
-        if self.results.multi_handedness is None:
-            return list()
-
-        hand_score = [(info.classification[0].label, info.classification[0].score)
-                        for info in self.results.multi_handedness]
-        return hand_score
+        return list(zip(self.handedness.tolist(), self.handedness_scores.tolist()))
 
     def get_labels(self) -> list:
         """발견된 손의 라벨을 리턴하는 함수
         """
+        return self.handedness.tolist()
 
-        if self.results.multi_handedness is None:
-            return list()
+    def get_landmark_array(self) -> np.ndarray:
+        """발견된 손의 랜드마크를 (손 갯수, 21, 3) 배열로 리턴하는 함수
+        """
+        return self.norm_landmarks
 
-        hand_labels = [info.classification[0].label
-                        for info in self.results.multi_handedness]
+    def get_abs_landmark_array(self) -> np.ndarray:
+        """발견된 손의 랜드마크의 절대좌표를 (손 갯수, 21, 3) 배열로 리턴하는 함수
+        x, y는 픽셀 단위로 버림 처리, z는 정규좌표 그대로
+        곱셈을 float32로 하면 반올림 때문에 버림한 픽셀이 파이썬 float로 계산하던 값과 1px 달라질 수 있어서 float64로 계산함
+        """
+        def compute() -> np.ndarray:
+            abs_landmarks = self.norm_landmarks.copy()
+            abs_landmarks[..., :2] = np.trunc(self.norm_landmarks[..., :2].astype(np.float64) * (self.width, self.height))
+            return abs_landmarks
 
-        return hand_labels
+        return self.cached("abs_landmarks", compute)
 
-    def get_landmarks(self) -> list:
-        """발견된 손의 랜드마크를 리턴하는 함수
+    def get_box_array(self) -> np.ndarray:
+        """발견된 손의 박스 좌표를 (손 갯수, 4) 배열로 리턴하는 함수
+        x, y, w, h
+        """
+        def compute() -> np.ndarray:
+            if self.count() == 0:
+                return np.empty((0, 4), np.int32)
+
+            points = self.get_abs_landmark_array()[..., :2].astype(np.int32)
+            min_pt = points.min(axis=1)
+            max_pt = points.max(axis=1)
+            return np.concatenate([min_pt, max_pt - min_pt], axis=1)
+
+        return self.cached("boxes", compute)
+
+    def get_box_landmark_array(self) -> np.ndarray:
+        """박스를 기준으로 랜드마크의 정규좌표를 (손 갯수, 21, 3) 배열로 리턴하는 함수
+        나눗셈은 float64로 하고 float32로 저장하므로 파이썬 float로 계산하던 값과 1e-7 정도 차이날 수 있음
+        너비나 높이가 0인 박스가 있으면 ValueError (HandUtil.detect는 이런 손을 결과에서 뺌)
         """
-        if self.count() == 0:
-            return list()
+        def compute() -> np.ndarray:
+            boxes = self.get_box_array()[:, np.newaxis, :].astype(np.float64)
+            if (boxes[..., 2:] <= 0).any():
+                raise ValueError(f"너비나 높이가 0인 손 박스가 있습니다 : {self.get_box_array().tolist()}")
+
+            box_landmarks = self.get_abs_landmark_array().copy()
+            box_landmarks[..., :2] = (box_landmarks[..., :2] - boxes[..., :2]) / boxes[..., 2:]
+            return box_landmarks
 
-        landmarks = []
-        for label, hand_landmark in zip(self.get_labels(), self.results.multi_hand_landmarks):
-            norm_landmarks = list(hand_landmark.landmark)
+        return self.cached("box_landmarks", compute)
 
-            landmarks.append((label, [[landmark.x, landmark.y, landmark.z]
-                                    for landmark in norm_landmarks]))
+    def drop_degenerate_boxes(self) -> "HandResult":
+        """너비나 높이가 0인 박스(랜드마크가 한 줄로 모인 손)를 뺀 결과, 빼는 손이 없으면 자기 자신
+        박스 기준 정규좌표를 계산할 수 없어서 분류에 쓸 수 없음
+        """
+        valid = (self.get_box_array()[:, 2:] > 0).all(axis=1)
+        if valid.all():
+            return self
 
-        return landmarks
+        return HandResult.from_arrays(self.img_shape, self.norm_landmarks[valid], self.handedness[valid]
+                                        , self.handedness_scores[valid])
+
+    def get_landmarks(self) -> list:
+        """발견된 손의 랜드마크를 리턴하는 함수
+        """
+        return list(zip(self.get_labels(), self.norm_landmarks.tolist()))
 
     def landmarks_to_abs_landmarks(self, landmarks : list) -> list:
         abs_landmarks = []
@@ -86,115 +330,189 @@ class HandResult:
     def get_abs_landmarks(self) -> list:
         """발견된 손의 랜드마크의 절대좌표를 리턴하는 함수
         """
-        if self.count() == 0:
-            return list()
-
-
-        landmarks = []
-        for hand_label, hand_landmark in zip(self.get_labels(), self.results.multi_hand_landmarks):
-            norm_landmarks = list(hand_landmark.landmark)
-
-            landmarks.append((hand_label, [[int(landmark.x * self.width), int(landmark.y * self.height), landmark.z]
-                                for landmark in norm_landmarks]))
+        abs_landmarks = self.get_abs_landmark_array()
+        points = abs_landmarks[..., :2].astype(np.int32).tolist()
+        zs = abs_landmarks[..., 2].tolist()
 
-        return landmarks
+        return [(hand_label, [[x, y, z] for (x, y), z in zip(hand_points, hand_zs)])
+                for hand_label, hand_points, hand_zs in zip(self.get_labels(), points, zs)]
 
     def get_boxes(self) -> list:
         """발견된 손의 박스 좌표를 리턴하는 함수
         x, y, w, h
         """
-        box_list = []
-
-        landmarks = self.get_abs_landmarks()
-        for hand_label, landmark in landmarks:
-            minX = min(landmark, key = lambda x : x[0])[0]
-            minY = min(landmark, key = lambda x : x[1])[1]
-            maxX = max(landmark, key = lambda x : x[0])[0]
-            maxY = max(landmark, key = lambda x : x[1])[1]
-            box = [minX, minY, maxX - minX, maxY - minY]
-            box_list.append((hand_label, box))
-
-        return box_list
+        return list(zip(self.get_labels(), self.get_box_array().tolist()))
 
     def get_landmark_from_box(self) -> list:
         """박스를 기준으로 랜드마크의 정규좌표를 리턴하는 함수
         """
-        boxes = self.get_boxes()
-        landmarks= self.get_abs_landmarks()
+        box_landmarks = self.get_box_landmark_array().tolist()
+        return [(hand_label, box, [tuple(landmark) for landmark in landmarks])
+                for hand_label, box, landmarks in zip(self.get_labels(), self.get_box_array().tolist(), box_landmarks)]
+
+    def get_pair_degree_array(self, pairs : np.ndarray, from_box : bool = False) -> np.ndarray:
+        """랜드마크 쌍들의 각도를 (손 갯수, 쌍 갯수) 배열로 리턴하는 함수
+        from_box가 True면 박스 기준 정규좌표, False면 절대좌표로 계산
+        """
+        pairs = np.asarray(pairs, dtype=np.intp).reshape(-1, 2)
+
+        def compute() -> np.ndarray:
+            landmarks = self.get_box_landmark_array() if from_box else self.get_abs_landmark_array()
+            return get_pair_degrees(landmarks, pairs)
+
+        return self.cached(("pair_degrees", from_box, pairs.tobytes()), compute)
+
+    def get_pair_direction_array(self, pairs : np.ndarray, from_box : bool = False) -> np.ndarray:
+        """랜드마크 쌍들의 방향을 (손 갯수, 쌍 갯수) 배열로 리턴하는 함수
+        """
+        pairs = np.asarray(pairs, dtype=np.intp).reshape(-1, 2)
 
-        label_box_landmarks = []
-        for box, landmark in zip(boxes, landmarks):
-            box_label, box = box
-            start_x, start_y, box_width, box_height = box
-            hand_label, landmark = landmark
-            label_box_landmarks.append((hand_label, box, [((x - start_x) / box_width, (y - start_y) / box_height, z)
-                                                     for x, y, z in landmark]))
+        def compute() -> np.ndarray:
+            return degrees_to_directions(self.get_pair_degree_array(pairs, from_box))
 
-        return label_box_landmarks
+        return self.cached(("pair_directions", from_box, pairs.tobytes()), compute)
+
+    def get_degree_array(self) -> np.ndarray:
+        """손목과 중지 시작점(0 -> 9)의 각도를 (손 갯수,) 배열로 리턴하는 함수
+        """
+        return self.get_pair_degree_array((HAND_DEGREE_PAIR,), from_box = True)[:, 0]
 
     def get_degree(self) -> list:
-        def get_degree_(start, end):
-            start_x, start_y = start
-            end_x, end_y = end
-            dx = end_x - start_x
-            dy = end_y - start_y
-            degree = math.atan2(dy, dx) * (180.0 / math.pi) + 90
-            degree = degree + 360 if degree < 0 else degree
-
-            return int(degree)
-
-        landmarks = self.get_landmark_from_box()
-        if not landmarks:
-            return list()
-            #return HAND_DISTANCE_NONE
-
-        #손목, 손바닥과 중지가 만나는 지점
-        #추후에 정확한 이름으로 수정
-        degrees = [get_degree_(landmark[0][:2], landmark[9][:2]) for _, _, landmark in landmarks]
-        return degrees
+        return self.get_degree_array().tolist()
 
-    def get_direction(self) -> list:
-        directions = []
-        degrees = self.get_degree()
-
-        for deg in degrees:
-            if deg > 315 and deg <= 360 or deg > 0 and deg <= 45:
-                directions.append(HAND_DISTANCE_UP)
-            elif deg > 45 and deg <= 135:
-                directions.append(HAND_DISTANCE_RIGHT)
-            elif deg > 135 and deg <= 225:
-                directions.append(HAND_DISTANCE_DOWN)
-            else:
-                directions.append(HAND_DISTANCE_LEFT)
+    def get_direction_array(self) -> np.ndarray:
+        return self.get_pair_direction_array((HAND_DEGREE_PAIR,), from_box = True)[:, 0]
 
-        return directions
+    def get_direction(self) -> list:
+        return self.get_direction_array().tolist()
 
     def test_landmark_draw(self, img : np.ndarray) -> np.ndarray:
-        if self.results.multi_hand_landmarks:
+        if self.results is not None and self.results.multi_hand_landmarks:
             img = img.copy()
+            solutions = get_mp_solutions()
             
             for hand_landmarks in self.results.multi_hand_landmarks:
-                mp_drawing.draw_landmarks(
+                solutions.drawing_utils.draw_landmarks(
                     img,
                     hand_landmarks,
-                    mp_hands.HAND_CONNECTIONS,
-                    mp_drawing_styles.get_default_hand_landmarks_style(),
-                    mp_drawing_styles.get_default_hand_connections_style())
+                    solutions.hands.HAND_CONNECTIONS,
+                    solutions.drawing_styles.get_default_hand_landmarks_style(),
+                    solutions.drawing_styles.get_default_hand_connections_style())
 
         return img
 
 
 class HandUtil:
+    # ROI 모드 설정
+    # 손 박스(여러 손이면 합친 박스)의 긴 변을 ROI_SCALE배 한 정사각형, 프레임 짧은 변의 ROI_MIN_SIZE배보다 작지 않음
+    ROI_SCALE = 2.0
+    ROI_MIN_SIZE = 0.3
+    # 손 박스가 ROI 가장자리에서 ROI 크기의 ROI_MARGIN배 안쪽에 들어오도록 ROI를 필요한 만큼만 옮김
+    ROI_MARGIN = 0.1
+    # 찾은 손이 max_num_hands보다 적으면 이 프레임 수마다 전체 프레임에서 새 손을 찾음
+    ROI_FULL_INTERVAL = 30
+
     def __init__(self, static_image_mode = True, max_num_hands = 2,
-                min_detection_confidence = 0.5):
+                min_detection_confidence = 0.5, min_tracking_confidence = 0.5, roi_mode = False):
 
         self.logger = logging.debug
-        self.detector = mp_hands.Hands(static_image_mode = static_image_mode,
-                                        max_num_hands = max_num_hands,
-                                        min_detection_confidence = min_detection_confidence)
+        self.static_image_mode = static_image_mode
+        self.max_num_hands = max_num_hands
+        self.min_detection_confidence = min_detection_confidence
+        self.min_tracking_confidence = min_tracking_confidence
+        # 연속된 프레임에서만 사용, 이전 손 주변만 잘라서 검출
+        self.roi_mode = roi_mode and not static_image_mode
+        self.detector = self.create_detector()
+        # ROI 모드에서 전체 프레임을 검출하는 정지 이미지용 검출기, 처음 쓸 때 만듬
+        self.full_detector = None
+        self.recorder = None
+        self._roi = None
+        # 추적 검출기가 마지막 ROI 검출에서 찾은 손 갯수
+        self._roi_tracked_count = 0
+        self.reset_stats()
 
     def __del__(self):
         self.detector.close()
+        if self.full_detector is not None:
+            self.full_detector.close()
+
+    @classmethod
+    def stream(cls, max_num_hands = 2, min_detection_confidence = 0.5,
+                min_tracking_confidence = 0.5, roi_mode = False) -> "HandUtil":
+        """카메라 같은 연속된 프레임용 설정
+        이전 프레임의 손을 추적하고, 추적중인 손이 부족할 때만 손바닥 검출을 실행함
+        roi_mode가 True면 이전 프레임의 손 주변만 잘라서 검출함 (detect_roi 참고)
+        """
+        return cls(static_image_mode = False, max_num_hands = max_num_hands,
+                    min_detection_confidence = min_detection_confidence,
+                    min_tracking_confidence = min_tracking_confidence, roi_mode = roi_mode)
+
+    def create_detector(self):
+        return get_mp_solutions().hands.Hands(static_image_mode = self.static_image_mode,
+                                max_num_hands = self.max_num_hands,
+                                min_detection_confidence = self.min_detection_confidence,
+                                min_tracking_confidence = self.min_tracking_confidence)
+
+    def reset(self) -> None:
+        """추적 상태를 초기화하는 함수
+        카메라가 바뀌거나 거울모드가 바뀌는 등 프레임이 연속되지 않을 때 호출
+        """
+        if not self.static_image_mode:
+            self.reset_detector()
+
+        self._roi = None
+        self._tracked_count = 0
+
+    def reset_detector(self) -> None:
+        # mediapipe의 reset은 그래프를 다시 만들지 않고 상태만 초기화함
+        if hasattr(self.detector, "reset"):
+            self.detector.reset()
+        else:
+            self.detector.close()
+            self.detector = self.create_detector()
+
+        self._roi_tracked_count = 0
+
+    def reset_stats(self) -> None:
+        self._tracked_count = 0
+        self._frame_count = 0
+        self._detection_count = 0
+        self._tracking_count = 0
+        self._roi_frame_count = 0
+        self._roi_count = 0
+        self._roi_miss_count = 0
+        self._roi_pixel_ratio_sum = 0.0
+
+    def update_stats(self, result : HandResult) -> None:
+        # mediapipe는 추적중인 손이 max_num_hands 보다 적을 때만 손바닥 검출을 실행함
+        # ROI 모드는 검출기를 나눠서 쓰므로 detect_roi에서 실제 호출 횟수를 셈
+        self._frame_count += 1
+        if not self.roi_mode:
+            if self.static_image_mode or self._tracked_count < self.max_num_hands:
+                self._detection_count += 1
+            else:
+                self._tracking_count += 1
+
+        self._tracked_count = result.count()
+
+    def get_stats(self) -> dict:
+        """검출과 추적 횟수, 검출 비율을 리턴하는 함수
+        ROI 모드에서 detection은 전체 프레임 검출(process_full) 횟수, tracking은 잘라낸 영역 검출 횟수
+        영역에서 손을 놓친 프레임은 둘 다 세므로 합이 프레임 수보다 클 수 있음
+        """
+        stats = {"frame" : self._frame_count
+                , "detection" : self._detection_count
+                , "tracking" : self._tracking_count
+                , "detection_ratio" : self._detection_count / self._frame_count if self._frame_count else 0.0}
+
+        if self.roi_mode:
+            # roi : 잘라서 검출한 프레임 수, roi_miss : 잘라낸 영역에서 손을 놓쳐서 전체 프레임으로 다시 검출한 수
+            # pixel_ratio : 전체 프레임 대비 실제로 처리한 픽셀의 평균 비율
+            stats.update({"roi" : self._roi_count
+                        , "roi_miss" : self._roi_miss_count
+                        , "pixel_ratio" : self._roi_pixel_ratio_sum / self._frame_count if self._frame_count else 0.0})
+
+        return stats
 
     def set_logger(self, logger) -> None:
         self.logger = logger
@@ -202,19 +520,174 @@ class HandUtil:
     def log(self, log_message : str):
         self.logger(f"[HandUtil] : {log_message}")
 
-    def detect(self, img : np.ndarray) -> HandResult:
-        result = self.detector.process(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
-        return HandResult(img.shape, result)
+    def set_recorder(self, recorder) -> None:
+        """detect 결과를 기록할 LandmarkRecordWriter, None이면 기록하지 않음
+        """
+        self.recorder = recorder
+
+    def process(self, img : np.ndarray, roi : tuple = None) -> HandResult:
+        """img 또는 img의 roi(x1, y1, x2, y2) 영역을 검출, 결과는 검출한 이미지 기준
+        """
+        if roi is not None:
+            x1, y1, x2, y2 = roi
+            img = img[y1:y2, x1:x2]
+
+        return HandResult(img.shape, self.detector.process(cv2.cvtColor(img, cv2.COLOR_BGR2RGB)))
+
+    def process_full(self, img : np.ndarray) -> HandResult:
+        """ROI 모드에서 전체 프레임을 검출, 추적 검출기의 상태를 바꾸지 않도록 정지 이미지용 검출기를 씀
+        """
+        if self.full_detector is None:
+            self.full_detector = get_mp_solutions().hands.Hands(static_image_mode = True,
+                                        max_num_hands = self.max_num_hands,
+                                        min_detection_confidence = self.min_detection_confidence)
+
+        return HandResult(img.shape, self.full_detector.process(cv2.cvtColor(img, cv2.COLOR_BGR2RGB)))
+
+    @staticmethod
+    def get_union_box(result : HandResult) -> tuple[int, int, int, int]:
+        """모든 손 박스를 합친 (x1, y1, x2, y2)
+        """
+        boxes = result.get_box_array()
+        x1, y1 = boxes[:, :2].min(axis=0).tolist()
+        x2, y2 = (boxes[:, :2] + boxes[:, 2:]).max(axis=0).tolist()
+        return x1, y1, x2, y2
+
+    def create_roi(self, result : HandResult, img_shape : tuple) -> tuple:
+        """손을 중심으로 새로 만든 영역 (x1, y1, x2, y2)
+        """
+        h, w = img_shape[:2]
+        x1, y1, x2, y2 = self.get_union_box(result)
+        size = max(x2 - x1, y2 - y1) * self.ROI_SCALE
+        size = int(max(size, min(h, w) * self.ROI_MIN_SIZE))
+        roi_w = min(size, w)
+        roi_h = min(size, h)
+        roi_x = int(np.clip((x1 + x2 - roi_w) / 2, 0, w - roi_w))
+        roi_y = int(np.clip((y1 + y2 - roi_h) / 2, 0, h - roi_h))
+
+        return roi_x, roi_y, roi_x + roi_w, roi_y + roi_h
+
+    def follow_roi(self, result : HandResult, roi : tuple, img_shape : tuple) -> tuple or None:
+        """크기는 그대로 두고 손 박스가 여유(ROI_MARGIN) 안쪽에 들어오도록 필요한 만큼만 옮긴 영역
+        손 박스가 여유를 뺀 크기보다 커서 들어가지 않으면 None
+        """
+        h, w = img_shape[:2]
+        x1, y1, x2, y2 = self.get_union_box(result)
+        rx1, ry1, rx2, ry2 = roi
+        roi_w = rx2 - rx1
+        roi_h = ry2 - ry1
+        margin = int(roi_w * self.ROI_MARGIN)
+        if x2 - x1 > roi_w - 2 * margin or y2 - y1 > roi_h - 2 * margin:
+            return None
+
+        # 프레임 가장자리에 붙으면 손이 더 나갈 곳이 없으므로 여유가 모자라도 됨
+        roi_x = int(np.clip(min(max(rx1, x2 + margin - roi_w), x1 - margin), 0, w - roi_w))
+        roi_y = int(np.clip(min(max(ry1, y2 + margin - roi_h), y1 - margin), 0, h - roi_h))
+
+        return roi_x, roi_y, roi_x + roi_w, roi_y + roi_h
+
+    def get_roi(self, result : HandResult, img_shape : tuple) -> tuple or None:
+        """다음 프레임에서 잘라낼 영역 (x1, y1, x2, y2), 손이 없으면 None
+        지금 영역이 있으면 크기를 유지한 채 손을 따라 옮기고, 손이 커서 들어가지 않으면 새로 만듬
+        """
+        if result.count() == 0:
+            return None
+
+        if self._roi is not None:
+            roi = self.follow_roi(result, self._roi, img_shape)
+            if roi is not None:
+                return roi
+
+        # 크기가 바뀌면 추적중인 손의 영역이 맞지 않게 되므로 추적을 초기화함
+        # (손을 놓친 뒤라면 추적 검출기에 남은 손이 없으므로 초기화하지 않음)
+        if self._roi_tracked_count:
+            self.reset_detector()
+
+        return self.create_roi(result, img_shape)
+
+    def detect_roi(self, img : np.ndarray) -> HandResult:
+        """이전 프레임의 손 주변만 잘라서 검출하고 결과는 전체 프레임 기준으로 바꿔서 리턴
+        잘라낸 영역에서 손을 놓치면 같은 프레임을 전체로 다시 검출함
+        추적 검출기는 잘라낸 영역만 처리하고 전체 프레임은 process_full로 검출하므로
+        영역을 옮기거나 전체 프레임을 검출해도 추적 상태가 유지됨
+        (영역을 옮기는 거리는 손이 움직인 거리보다 작으므로 추적중인 손은 영역 안에서 더 적게 움직임)
+        """
+        h, w = img.shape[:2]
+        roi = self._roi
+        if (roi is not None and self._roi_frame_count >= self.ROI_FULL_INTERVAL
+            and self._tracked_count < self.max_num_hands):
+            roi = None
+
+        result = None
+        if roi is not None:
+            result = self.process(img, roi)
+            self._tracking_count += 1
+            self._roi_tracked_count = result.count()
+            self._roi_pixel_ratio_sum += (roi[2] - roi[0]) * (roi[3] - roi[1]) / (w * h)
+            if result.count():
+                result = result.map_from_roi(img.shape, roi)
+                self._roi_frame_count += 1
+                self._roi_count += 1
+            else:
+                self._roi_miss_count += 1
+                result = None
+
+        if result is None:
+            result = self.process_full(img)
+            self._detection_count += 1
+            self._roi_frame_count = 0
+            self._roi_pixel_ratio_sum += 1.0
+
+        self._roi = self.get_roi(result, img.shape)
+        return result
+
+    def detect(self, img : np.ndarray, timestamp : float = None) -> HandResult:
+        """timestamp는 기록할 때의 프레임 시간, 없으면 기록하는 시점의 시간
+        박스의 너비나 높이가 0인 손은 결과에서 뺌 (HandResult.drop_degenerate_boxes)
+        """
+        result = self.detect_roi(img) if self.roi_mode else self.process(img)
+        result = result.drop_degenerate_boxes()
+        self.update_stats(result)
+        if self.recorder is not None:
+            self.recorder.write(result, timestamp)
+
+        return result
 
     def extract(self, img : np.ndarray) -> tuple:
         result = self.detect(img)
         if result.count() == 0:
             return tuple()
 
-        landmarks = result.get_landmark_from_box()
-        return result, [np.asarray(landmark).flatten() for _, _, landmark in landmarks]
+        landmarks = result.get_box_landmark_array()
+        return result, [landmark.flatten() for landmark in landmarks]
+
+    def detect_file(self, file : str) -> HandResult:
+        """이미지 파일 1개를 가로 600으로 줄여서 검출하는 함수
+        """
+        import imutils
+
+        img = cv2_imread(file)
+        img = imutils.resize(img, width=600)
+        return self.detect(img)
+
+    def extract_file(self, file : str) -> tuple:
+        """이미지 파일 1개에서 (이름, 데이터)를 추출하는 함수, 손이 없다면 빈 tuple
+        이름은 파일이 들어있는 폴더 이름
+        """
+        result = self.detect_file(file)
+        if result.count() == 0:
+            return tuple()
+
+        name = file.split(os.path.sep)[-2]
+        return name, result.get_box_landmark_array()[0].flatten() #맨 처음 등록된 1개의 정보만 데이터로 등록
 
-    def extract_dataset(self, dataset_path : str or list) -> dict:
+    def extract_dataset(self, dataset_path : str or list, workers : int = 1, chunk_size : int = 32,
+                        store = None) -> dict:
+        """데이터셋의 모든 이미지에서 데이터를 추출하는 함수
+        workers가 2 이상이면 파일 목록을 나눠서 여러 프로세스에서 처리, 0 이하면 cpu 갯수만큼 사용
+        결과의 순서는 workers와 관계없이 파일 목록의 순서와 같음
+        store(LandmarkStore)가 있다면 새로 추가되거나 바뀐 파일만 검출하고 나머지는 저장된 정보를 사용
+        """
         file_list = []
         
         def get_file_list() -> list:
@@ -223,33 +696,183 @@ class HandUtil:
         file_list = get_file_list() if type(dataset_path) == str else dataset_path
         self.log(f"[INFO] file count : {len(file_list)}")
 
+        if workers <= 0:
+            workers = os.cpu_count() or 1
+
+        if store is not None:
+            store.set_config(self.get_file_config())
+
+        target_list = file_list if store is None else store.find_missing(file_list)
+        if store is not None:
+            self.log(f"[INFO] cached : {len(file_list) - len(target_list)}, detect : {len(target_list)}")
+
+        if workers > 1 and len(target_list) > chunk_size:
+            results = self.detect_files_parallel(target_list, workers, chunk_size)
+        else:
+            results = self.detect_files(target_list)
+
+        if store is not None:
+            for file, result in zip(target_list, results):
+                store.update(file, result)
+
+            store.retain(file_list)
+            store.save()
+            results = [store.get(file) for file in file_list]
+
         name_list = []
         data_list = []
-        for idx, file in enumerate(file_list):
-            self.log(f"[INFO] process... {idx + 1}/{len(file_list)}")
-            name = file.split(os.path.sep)[-2]
-
-            img = cv2_imread(file)
-            img = imutils.resize(img, width=600)
-            result = self.extract(img)
-            if not result:
+        for file, result in zip(file_list, results):
+            if result.count() == 0:
                 continue
 
-            name_list.append(name)
+            name_list.append(file.split(os.path.sep)[-2])
+            data_list.append(result.get_box_landmark_array()[0].flatten()) #맨 처음 등록된 1개의 정보만 데이터로 등록
+
+        self.log("done")
+        return {"name" : name_list, "data" : data_list}
+
+    def extract_video_dataset(self, video_list : list, label_dict : dict, frame_step : int = 1,
+                                max_frames : int = None, flip : bool = False, flip_except_list : tuple = (),
+                                dump_dir : str = None) -> dict:
+        """동영상의 프레임을 이미지 파일로 저장하지 않고 바로 데이터를 추출하는 함수
+        label_dict : {"ㄱ" : "giyeok.mp4"} 형태, 동영상 파일 이름으로 라벨을 찾음
+        frame_step : frame_step 프레임마다 1개씩 사용, max_frames : 동영상마다 사용할 최대 프레임 수
+        flip : 좌우 반전해서 추출, flip_except_list에 있는 라벨은 반전하지 않음
+        dump_dir : 디버그용, 사용한 프레임을 dump_dir/라벨/번호.jpg로 저장
+        """
+        import imutils
+
+        file_label_dict = {file_name : label for label, file_name in label_dict.items()}
+
+        # 데이터셋은 항상 정적 이미지 모드로 처리
+        detector = self
+        if not self.static_image_mode:
+            detector = HandUtil(max_num_hands = self.max_num_hands,
+                                min_detection_confidence = self.min_detection_confidence)
+            detector.set_logger(self.logger)
+
+        name_list = []
+        data_list = []
+        for video_idx, video in enumerate(video_list):
+            file_name = os.path.split(video)[-1]
+            name = file_label_dict.get(file_name)
+            if name is None:
+                raise RuntimeError(f"{file_name} 동영상의 라벨을 찾을 수 없습니다")
+
+            dump_frame_dir = os.path.join(dump_dir, name) if dump_dir else None
+            if dump_frame_dir and not os.path.isdir(dump_frame_dir):
+                os.makedirs(dump_frame_dir)
+
+            use_flip = flip and name not in flip_except_list
+            frame_count = 0
+            for frame_idx, frame in read_video_frames(video, frame_step, max_frames):
+                if use_flip:
+                    frame = cv2.flip(frame, 1)
+
+                if dump_frame_dir:
+                    cv2_imwrite(os.path.join(dump_frame_dir, f"{frame_idx}.jpg"), frame)
+
+                result = detector.detect(imutils.resize(frame, width=600))
+                frame_count += 1
+                if result.count() == 0:
+                    continue
+
+                name_list.append(name)
+                data_list.append(result.get_box_landmark_array()[0].flatten()) #맨 처음 등록된 1개의 정보만 데이터로 등록
 
-            hand_result, data = result
-            data_list.append(data[0]) #맨 처음 등록된 1개의 정보만 데이터로 등록
+            self.log(f"[INFO] process... {video_idx + 1}/{len(video_list)} {name} : {frame_count} frames")
 
         self.log("done")
         return {"name" : name_list, "data" : data_list}
 
+    def get_file_config(self) -> dict:
+        """detect_files로 검출할 때의 설정, LandmarkStore에 저장된 결과가 같은 설정으로 검출됐는지 비교하는 용도
+        """
+        return {"static_image_mode" : True
+                , "max_num_hands" : self.max_num_hands
+                , "min_detection_confidence" : self.min_detection_confidence}
+
+    def detect_files(self, file_list : list) -> list:
+        # 데이터셋의 이미지는 서로 연속되지 않으므로 항상 정적 이미지 모드로 처리
+        detector = self
+        if not self.static_image_mode:
+            detector = HandUtil(max_num_hands = self.max_num_hands,
+                                min_detection_confidence = self.min_detection_confidence)
+            detector.set_logger(self.logger)
+
+        results = []
+        for idx, file in enumerate(file_list):
+            self.log(f"[INFO] process... {idx + 1}/{len(file_list)}")
+            results.append(detector.detect_file(file))
+
+        return results
+
+    def detect_files_parallel(self, file_list : list, workers : int, chunk_size : int) -> list:
+        """파일 목록을 chunk_size 단위로 나눠서 workers 갯수의 프로세스에서 처리하는 함수
+        각 프로세스는 자신만의 mediapipe 인스턴스를 가짐
+        """
+        chunks = [file_list[idx:idx + chunk_size] for idx in range(0, len(file_list), chunk_size)]
+        self.log(f"[INFO] workers : {workers}, chunks : {len(chunks)}")
+
+        results = []
+        # mediapipe 그래프는 fork 후에 안전하지 않으므로 spawn 사용
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(workers, initializer = init_detect_worker,
+                            initargs = (self.max_num_hands, self.min_detection_confidence)) as pool:
+            for chunk_results in pool.imap(detect_worker_files, chunks):
+                results.extend(chunk_results)
+                self.log(f"[INFO] process... {len(results)}/{len(file_list)}")
+
+        return results
+
+
+def read_video_frames(video_path : str, frame_step : int = 1, max_frames : int = None):
+    """동영상의 (프레임 번호, 프레임)을 frame_step 간격으로 읽는 제너레이터
+    건너뛰는 프레임은 grab만 하고 디코딩하지 않음
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise RuntimeError(f"{video_path}를 열 수 없습니다.")
+
+    try:
+        frame_idx = 0
+        read_count = 0
+        while max_frames is None or read_count < max_frames:
+            if frame_idx % frame_step:
+                if not cap.grab():
+                    break
+            else:
+                success, frame = cap.read()
+                if not success:
+                    break
+
+                read_count += 1
+                yield frame_idx, frame
+
+            frame_idx += 1
+    finally:
+        cap.release()
+
+
+# 병렬 추출용 프로세스별 검출기
+_worker_detector : HandUtil = None
+
+def init_detect_worker(max_num_hands : int, min_detection_confidence : float) -> None:
+    global _worker_detector
+    _worker_detector = HandUtil(max_num_hands = max_num_hands,
+                                min_detection_confidence = min_detection_confidence)
+
+
+def detect_worker_files(file_list : list) -> list:
+    return [_worker_detector.detect_file(file) for file in file_list]
+
 
 if __name__ == "__main__":
     cur_dir = os.path.dirname(__file__)
     dataset_dir = os.path.join(cur_dir, "..", "..", "dataset")
     dataset_dir = os.path.abspath(dataset_dir)
 
-    hand = HandUtil()
+    hand = HandUtil.stream()
     cap = cv2.VideoCapture(0)
 
     while cap.isOpened():
@@ -9,16 +9,32 @@ import numpy as np
 from . import hand
 from . import train
 from . import image
+from .landmark_store import LandmarkStore
 
 class HandTrainer:
-    def __init__(self, trainer : train.SvmUtil = train.SvmUtil()):
-        self.detector = hand.HandUtil()
-        self.trainer = trainer
+    def __init__(self, trainer : train.SvmUtil = None, static_image_mode : bool = True
+                , max_num_hands : int = 2, roi_mode : bool = False):
+        self.detector = hand.HandUtil(static_image_mode = static_image_mode, max_num_hands = max_num_hands
+                                        , roi_mode = roi_mode)
+        self.trainer = trainer or train.SvmUtil()
         self.set_logger(logging.debug)
 
     def __del__(self):
         pass
 
+    @classmethod
+    def stream(cls, trainer : train.SvmUtil = None, max_num_hands : int = 2, roi_mode : bool = False) -> "HandTrainer":
+        """카메라 같은 연속된 프레임용 설정, 학습(train)은 항상 정적 이미지 모드로 처리됨
+        roi_mode는 HandUtil.stream 참고
+        """
+        return cls(trainer, static_image_mode = False, max_num_hands = max_num_hands, roi_mode = roi_mode)
+
+    def reset(self) -> None:
+        self.detector.reset()
+
+    def get_stats(self) -> dict:
+        return self.detector.get_stats()
+
     def set_logger(self, logger) -> None:
         self.logger = logger
         self.detector.set_logger(logger)
@@ -27,11 +43,30 @@ class HandTrainer:
     def log(self, log_message: str) -> None:
         self.logger(f"[HandTrainer] : {log_message}")
 
-    def train(self, dataset_path : str) -> None:
-        data = self.detector.extract_dataset(dataset_path)
-        names, datas = data.values()
-
-        self.trainer.train_svm(datas, names)
+    def train(self, dataset_path : str, workers : int = 1, store_path : str = None) -> None:
+        """store_path가 있다면 검출 결과를 저장해두고 다음 학습부터는 바뀐 이미지만 검출함
+        """
+        store = None
+        if store_path:
+            store = LandmarkStore(store_path)
+            store.set_logger(self.logger)
+
+        data = self.detector.extract_dataset(dataset_path, workers, store = store)
+        self.train_data(data)
+
+    def train_data(self, data : dict) -> None:
+        """extract_dataset 형태({"name", "data"})의 데이터로 학습
+        """
+        self.trainer.train_svm(data["data"], data["name"])
+
+    def train_video(self, video_list : list, label_dict : dict, frame_step : int = 1,
+                    flip : bool = False, flip_except_list : tuple = (), dump_dir : str = None) -> None:
+        """동영상에서 바로 데이터를 추출해서 학습, 인자는 HandUtil.extract_video_dataset 참고
+        """
+        data = self.detector.extract_video_dataset(video_list, label_dict, frame_step,
+                                                    flip = flip, flip_except_list = flip_except_list,
+                                                    dump_dir = dump_dir)
+        self.train_data(data)
 
     def save(self, save_path : str) -> None:
         self.trainer.save_svm(save_path)
@@ -39,8 +74,8 @@ class HandTrainer:
     def load(self, load_path : str) -> None:
         self.trainer.load_svm(load_path)
 
-    def detect(self, img : np.ndarray) -> hand.HandUtil:
-        return self.detector.detect(img)
+    def detect(self, img : np.ndarray, timestamp : float = None) -> hand.HandResult:
+        return self.detector.detect(img, timestamp)
 
     def detect_boxes(self, img : np.ndarray) -> list:
         result = self.detector.detect(img)
@@ -50,15 +85,66 @@ class HandTrainer:
         result = self.detector.detect(img)
         return result.get_boxes(), result.test_landmark_draw(img)
 
-    def predict(self, img : np.ndarray) -> tuple[hand.HandResult, tuple]:
-        result = self.detector.extract(img)
-        if not result:
+    @staticmethod
+    def get_datas(hand_result : hand.HandResult) -> list:
+        """검출 결과를 분류 모델의 입력 데이터로 바꾸는 함수
+        """
+        return [landmark.flatten() for landmark in hand_result.get_box_landmark_array()]
+
+    def predict_proba(self, hand_result : hand.HandResult, mirror : bool = False) -> np.ndarray:
+        datas = self.get_datas(hand_result)
+        if mirror:
+            return mirror_predict_proba(self.trainer, datas)
+
+        return self.trainer.predict_proba(datas)
+
+    def classify(self, hand_result : hand.HandResult, mirror : bool = False) -> tuple[hand.HandResult, tuple]:
+        """이미 검출한 결과로 추론하는 함수, 검출과 추론을 다른 스레드에서 나눠서 처리할 때 사용
+        """
+        if hand_result.count() == 0:
             return list()
 
-        hand_result, datas = result
-        predict_result = self.trainer.predict(datas)
+        return hand_result, self.trainer.proba_to_predict(self.predict_proba(hand_result, mirror))
+
+    def predict(self, img : np.ndarray, mirror : bool = False) -> tuple[hand.HandResult, tuple]:
+        """mirror가 True면 좌우 반전된 이미지로 보고 추론 (mirror_predict_proba 참고)
+        거울모드용 모델을 따로 불러오지 않고 모델 1개로 두 모드를 처리함
+        """
+        return self.classify(self.detector.detect(img), mirror)
+
+    def verify(self, img : np.ndarray, target_label : str, mirror : bool = False,
+                pairwise : bool = False) -> tuple[hand.HandResult, tuple]:
+        """손이 target_label인지만 확인하는 함수, 리턴은 (검출 결과, ((통과 여부, 점수), ...))
+        pairwise는 SvmUtil.verify 참고, 거울모드는 결합 확률이 필요해서 pairwise를 사용하지 않음
+        다른 글자를 했을 때 그 글자가 필요하면 predict를 사용
+        """
+        hand_result = self.detector.detect(img)
+        if hand_result.count() == 0:
+            return list()
+
+        if mirror:
+            return hand_result, self.trainer.proba_to_verify(self.predict_proba(hand_result, True), target_label)
+
+        return hand_result, self.trainer.verify(self.get_datas(hand_result), target_label, pairwise = pairwise)
+
+
+def mirror_predict_proba(trainer : train.SvmUtil, datas : list
+                            , except_list : tuple = hand.MIRROR_EXCEPT_LIST) -> np.ndarray:
+    """거울모드 결합 확률, 예전 mirror_model(except_list만 빼고 반전한 데이터로 학습)과 같은 기준
+    except_list 라벨은 원본 데이터의 확률, 나머지 라벨은 반전한 데이터의 확률을 쓰고 합이 1이 되게 정규화
+    원본과 반전 데이터는 한 번에 묶어서 추론함
+    """
+    datas = np.asarray(datas, dtype=np.float32).reshape(len(datas), -1)
+    mirrored = hand.mirror_features(datas)
+    except_mask = np.isin(trainer.get_labels(), except_list)
+    if not except_mask.any():
+        return np.asarray(trainer.predict_proba(mirrored))
+
+    count = len(datas)
+    results = np.asarray(trainer.predict_proba(np.concatenate([mirrored, datas])))
+    results = np.where(except_mask, results[count:], results[:count])
 
-        return hand_result, predict_result
+    return results / results.sum(axis=1, keepdims=True)
 
 if __name__ == "__main__":
     pass
\ No newline at end of file
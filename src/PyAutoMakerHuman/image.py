@@ -1,8 +1,8 @@
 import os
+from functools import lru_cache
 
 import cv2
 import numpy as np
-from PIL import ImageFont, ImageDraw, Image
 
 
 def cv2_imread(filename : str, flags : int = cv2.IMREAD_COLOR) -> np.ndarray:
@@ -20,20 +20,68 @@ def cv2_imwrite(filename : str, img : np.ndarray, params : list = None):
             raw_img.tofile(f)
 
 
+FONT_PATH = "fonts/gulim.ttc"
+TEXT_MASK_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize = 16)
+def get_font(font_path : str, size : int) -> "ImageFont.FreeTypeFont":
+    """(경로, 크기)별로 불러온 폰트를 재사용, PIL은 글자를 처음 그릴 때 불러옴
+    """
+    from PIL import ImageFont
+
+    return ImageFont.truetype(font_path, size)
+
+
+@lru_cache(maxsize = TEXT_MASK_CACHE_SIZE)
+def get_text_mask(text : str, font_path : str, size : int, stroke_width : int = 0) -> tuple[np.ndarray, tuple[int, int]]:
+    """글자를 그린 알파 마스크(uint8)와 그리는 위치 기준 마스크의 좌상단 오프셋
+    같은 글자는 다시 그리지 않도록 LRU로 보관, 공유되므로 읽기 전용
+    """
+    from PIL import ImageDraw, Image
+
+    font = get_font(font_path, size)
+    left, top, right, bottom = font.getbbox(text, stroke_width = stroke_width)
+    mask_pil = Image.new("L", (max(right - left, 1), max(bottom - top, 1)), 0)
+    ImageDraw.Draw(mask_pil).text((-left, -top), text, font = font, fill = 255, stroke_width = stroke_width)
+
+    mask = np.array(mask_pil)
+    mask.flags.writeable = False
+    return mask, (left, top)
+
+
 def cv2_putText(img, text, org, fontScale, color, thickness=..., lineType=..., bottomLeftOrigin=..., center=...):
-    fontpath = "fonts/gulim.ttc"
-    font = ImageFont.truetype(fontpath, int(10 * fontScale))
-    img_pil = Image.fromarray(img)
-    draw = ImageDraw.Draw(img_pil)
+    """한글을 그릴 수 있는 cv2.putText, cv2.putText처럼 img에 바로 그리고 img를 리턴
+    글자 마스크는 캐시하고 글자가 그려지는 영역만 섞음
+    """
+    size = int(10 * fontScale)
+    stroke_width = thickness if isinstance(thickness, int) else 0
     if center is True:
-        H, W, _ = img.shape
-        #x, y = W / 2, H / 2
-        w, h = draw.textsize(text, font = font)
+        H, W = img.shape[:2]
+        _, _, w, h = get_font(FONT_PATH, size).getbbox(text)
         org = (W - w) / 2, (H - h) / 2
 
-    draw.text(org, text, font=font, fill=color, stroke_width=thickness)
+    mask, (left, top) = get_text_mask(text, FONT_PATH, size, stroke_width)
+    x, y = int(org[0]) + left, int(org[1]) + top
+    mask_h, mask_w = mask.shape
+
+    # 이미지 밖으로 나가는 부분은 자름
+    x1, y1 = max(x, 0), max(y, 0)
+    x2, y2 = min(x + mask_w, img.shape[1]), min(y + mask_h, img.shape[0])
+    if x1 >= x2 or y1 >= y2:
+        return img
 
-    return np.array(img_pil)
+    roi = img[y1:y2, x1:x2]
+    alpha = mask[y1 - y:y2 - y, x1 - x:x2 - x].astype(np.uint16)
+    if roi.ndim == 3:
+        alpha = alpha[..., None]
+        color = np.array(color[:roi.shape[2]], dtype=np.uint16)
+    else:
+        color = np.uint16(color if np.isscalar(color) else color[0])
+
+    roi[:] = (roi * (255 - alpha) + color * alpha + 127) // 255
+
+    return img
 
 
 if __name__ == "__main__":
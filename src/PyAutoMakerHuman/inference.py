@@ -0,0 +1,310 @@
+import os
+import json
+import logging
+from threading import Thread, Event, Lock, Condition
+
+from . import models_dir
+from .gui import datas_dir
+from .hand_train import HandTrainer
+from .train import SvmUtil
+from .startup import profiler
+
+
+MODEL_NAME = "model"
+CORRECTION_INFO_PATH = os.path.join(datas_dir, "proc_data.json")
+
+# 빌려간 검출기가 없을 때 돌려받기를 기다리는 최대 시간(초), 지나면 새로 만듬
+BORROW_TIMEOUT = 2.0
+# 모델 폴더를 확인하는 간격(초)
+WATCH_INTERVAL = 1.0
+# 카메라 검출기는 이전 손 주변만 잘라서 검출 (HandUtil.detect_roi)
+ROI_MODE = True
+
+
+def get_model_signature(model_path : str) -> tuple:
+    """모델 폴더 파일들의 (이름, 크기, 수정 시간), 바뀌었는지 비교하는 용도
+    """
+    if not os.path.isdir(model_path):
+        return tuple()
+
+    signature = list()
+    for entry in sorted(os.scandir(model_path), key = lambda entry : entry.name):
+        if entry.is_file():
+            stat = entry.stat()
+            signature.append((entry.name, stat.st_size, stat.st_mtime_ns))
+
+    return tuple(signature)
+
+
+class DetectorSet:
+    """엔진 1개가 빌려가는 정면, 측면 검출기 묶음
+    카메라마다 추적 상태가 따로 있어야 해서 검출기는 나눠 쓰고 분류 모델은 서비스의 것을 공유함
+    """
+    def __init__(self, trainer : SvmUtil, max_num_hands : int, roi_mode : bool = ROI_MODE):
+        self.max_num_hands = max_num_hands
+        self.front = HandTrainer.stream(trainer, max_num_hands = max_num_hands, roi_mode = roi_mode)
+        self.side = HandTrainer.stream(trainer, max_num_hands = max_num_hands, roi_mode = roi_mode)
+
+    def __del__(self):
+        pass
+
+    def set_trainer(self, trainer : SvmUtil) -> None:
+        """모델 참조만 바꿈, 추론중인 스레드는 다음 classify부터 새 모델을 씀
+        """
+        self.front.trainer = trainer
+        self.side.trainer = trainer
+
+    def reset(self) -> None:
+        self.front.reset()
+        self.side.reset()
+
+
+class InferenceService:
+    """프로세스에 1개, 검출기와 분류 모델(일반, 거울), 보정 정보(proc_data.json)를 가지고 있는 클래스
+    학습, 시험 창의 엔진은 여기서 검출기를 빌려가고 끝나면 돌려주므로 창을 바꿔도 모델을 다시 불러오지 않음
+    모델과 보정 정보는 읽기 전용으로 공유됨
+    모델을 다시 불러올 때는 새 SvmUtil을 끝까지 만든 뒤 참조만 바꿔서 공개하므로
+    추론하는 쪽은 락 없이 읽고, 불러오는 동안에도 이전 모델로 계속 추론함 (불러온 SvmUtil은 수정하지 않음)
+    """
+    def __init__(self, borrow_timeout : float = BORROW_TIMEOUT):
+        self.borrow_timeout = borrow_timeout
+        self.logger = logging.debug
+        self._lock = Lock()
+        self._returned = Condition(self._lock)
+        # 불러오기는 1번에 1개씩, 추론하는 쪽은 이 락을 쓰지 않음
+        self._reload_lock = Lock()
+        self._trainers = dict()
+        self._signatures = dict()
+        self._failed_signatures = dict()
+        self._reload_count = 0
+        self._watcher : ModelWatcher = None
+        self._correction_info = None
+        # 만든 검출기 전체, 모델을 바꾸면 빌려간 것까지 모두 바꿈
+        self._detector_sets = list()
+        # max_num_hands별로 쉬고 있는 검출기와 만든 갯수
+        self._idle_detectors = dict()
+        self._created_count = dict()
+        self._borrow_count = 0
+
+    def __del__(self):
+        pass
+
+    def set_logger(self, logger) -> None:
+        self.logger = logger
+
+    def log(self, log_message : str) -> None:
+        self.logger(f"[InferenceService] : {log_message}")
+
+    def get_trainer(self, name : str = MODEL_NAME) -> SvmUtil:
+        """models_dir/name 모델, 처음 요청할 때 1번만 불러옴
+        """
+        trainer = self._trainers.get(name)
+        if trainer is not None:
+            return trainer
+
+        with self._reload_lock:
+            if name not in self._trainers:
+                with profiler.section(f"model load : {name}"):
+                    signature, trainer = self.load_trainer(name)
+
+                self.publish(name, signature, trainer)
+
+            return self._trainers[name]
+
+    @staticmethod
+    def get_model_path(name : str) -> str:
+        return os.path.join(models_dir, name)
+
+    def load_trainer(self, name : str) -> tuple[tuple, SvmUtil]:
+        """(불러오기 전의 폴더 상태, 새로 불러온 SvmUtil)
+        불러오는 중에 파일이 바뀌면 다음 확인 때 다시 불러오도록 상태는 먼저 읽어둠
+        """
+        model_path = self.get_model_path(name)
+        signature = get_model_signature(model_path)
+        trainer = SvmUtil()
+        trainer.set_logger(self.logger)
+        trainer.load_svm(model_path)
+        return signature, trainer
+
+    def publish(self, name : str, signature : tuple, trainer : SvmUtil) -> None:
+        with self._lock:
+            self._trainers[name] = trainer
+            self._signatures[name] = signature
+            detector_sets = list(self._detector_sets) if name == MODEL_NAME else list()
+
+        for detector_set in detector_sets:
+            detector_set.set_trainer(trainer)
+
+    def reload(self, name : str = MODEL_NAME) -> bool:
+        """모델을 다시 불러와서 바꿈, 실패하면 이전 모델을 그대로 쓰고 False
+        호출한 스레드에서 불러오므로 GUI나 추론 스레드에서는 reload_async를 사용
+        """
+        with self._reload_lock:
+            try:
+                with profiler.section(f"model reload : {name}"):
+                    signature, trainer = self.load_trainer(name)
+            except Exception as e:
+                # 같은 상태로는 다시 시도하지 않음, 파일이 또 바뀌면 다시 불러옴
+                self._failed_signatures[name] = get_model_signature(self.get_model_path(name))
+                self.log(f"[WARNING] reload fail : {name}, {e!r}")
+                return False
+
+            self.publish(name, signature, trainer)
+            self._reload_count += 1
+
+        self.log(f"[INFO] reload : {name}")
+        return True
+
+    def reload_async(self, name : str = MODEL_NAME) -> Thread:
+        thread = Thread(target = self.reload, args = (name,), name = f"reload_{name}", daemon = True)
+        thread.start()
+        return thread
+
+    def get_changed_models(self) -> list:
+        """불러온 뒤로 폴더 내용이 바뀐 모델 이름과 현재 폴더 상태
+        """
+        with self._lock:
+            signatures = dict(self._signatures)
+
+        changed = list()
+        for name, signature in signatures.items():
+            current = get_model_signature(self.get_model_path(name))
+            if current and current != signature and current != self._failed_signatures.get(name):
+                changed.append((name, current))
+
+        return changed
+
+    def start_watch(self, interval : float = WATCH_INTERVAL) -> None:
+        """모델 폴더가 바뀌면 다시 불러오는 ModelWatcher 시작
+        """
+        with self._lock:
+            if self._watcher is not None and self._watcher.is_alive():
+                return
+
+            self._watcher = ModelWatcher(self, interval)
+            self._watcher.start()
+
+    def stop_watch(self) -> None:
+        with self._lock:
+            watcher, self._watcher = self._watcher, None
+
+        if watcher is not None:
+            watcher.join()
+
+    @property
+    def trainer(self) -> SvmUtil:
+        return self.get_trainer(MODEL_NAME)
+
+    def get_correction_info(self) -> dict:
+        """글자별 방향 보정 정보, 수정하지 말 것
+        """
+        with self._lock:
+            if self._correction_info is None:
+                with open(CORRECTION_INFO_PATH, "rb") as f:
+                    self._correction_info = json.loads(f.read())
+
+            return self._correction_info
+
+    def borrow(self, max_num_hands : int = 2) -> DetectorSet:
+        """쉬고 있는 검출기를 빌려줌
+        모두 빌려간 상태라면 borrow_timeout 동안 돌려받기를 기다리고, 그래도 없으면 새로 만듬
+        (창을 바꿀 때 이전 엔진이 끝나기 전에 다음 엔진이 빌리는 경우를 위해 기다림)
+        """
+        with self._lock:
+            idle = self._idle_detectors.setdefault(max_num_hands, list())
+            if not idle and self._created_count.get(max_num_hands, 0):
+                self._returned.wait_for(lambda : idle, self.borrow_timeout)
+
+            self._borrow_count += 1
+            if idle:
+                return idle.pop()
+
+            self._created_count[max_num_hands] = self._created_count.get(max_num_hands, 0) + 1
+
+        self.log(f"[INFO] create detector set : max_num_hands={max_num_hands}")
+        trainer = self.get_trainer(MODEL_NAME)
+        with profiler.section("detector create"):
+            detector_set = DetectorSet(trainer, max_num_hands)
+
+        with self._lock:
+            # 만드는 동안 모델이 바뀌었을 수 있음
+            self._detector_sets.append(detector_set)
+            detector_set.set_trainer(self._trainers[MODEL_NAME])
+
+        return detector_set
+
+    def give_back(self, detectors : DetectorSet) -> None:
+        """빌려간 검출기를 돌려받음, 추적 상태는 다음에 빌려간 엔진이 처음 검출할 때 초기화함
+        """
+        with self._lock:
+            self._idle_detectors.setdefault(detectors.max_num_hands, list()).append(detectors)
+            self._returned.notify_all()
+
+    def preload(self, max_num_hands : int = 2) -> None:
+        """모델, 보정 정보, 검출기 1묶음을 미리 만들어둠 (WarmUp에서 실행)
+        """
+        self.get_correction_info()
+        with self._lock:
+            if self._created_count.get(max_num_hands, 0):
+                return
+
+        self.give_back(self.borrow(max_num_hands))
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {"models" : list(self._trainers)
+                    , "reload" : self._reload_count
+                    , "created" : dict(self._created_count)
+                    , "idle" : {key : len(value) for key, value in self._idle_detectors.items()}
+                    , "borrow" : self._borrow_count}
+
+
+class ModelWatcher(Thread):
+    """불러온 모델 폴더의 파일 상태를 interval마다 확인해서 바뀌면 이 스레드에서 다시 불러옴
+    학습이 파일을 쓰는 중에 불러오지 않도록 바뀐 상태가 한번 더 같게 확인될 때 불러옴
+    """
+    def __init__(self, service : InferenceService, interval : float = WATCH_INTERVAL):
+        super().__init__(name = "model_watcher", daemon = True)
+        self.service = service
+        self.interval = interval
+        self._exit_event = Event()
+        self._pending = dict()
+
+    def __del__(self):
+        pass
+
+    def run(self) -> None:
+        while not self._exit_event.wait(self.interval):
+            changed = dict(self.service.get_changed_models())
+            for name, signature in changed.items():
+                if self._pending.get(name) == signature:
+                    self.service.reload(name)
+                    del self._pending[name]
+                else:
+                    self._pending[name] = signature
+
+            for name in list(self._pending):
+                if name not in changed:
+                    del self._pending[name]
+
+    def exit(self) -> None:
+        self._exit_event.set()
+
+    def join(self, timeout : float = None) -> None:
+        self.exit()
+        return super().join(timeout)
+
+
+_service = None
+_service_lock = Lock()
+
+
+def get_service() -> InferenceService:
+    """프로세스에 1개인 InferenceService, 처음 호출할 때 만듬
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = InferenceService()
+
+        return _service
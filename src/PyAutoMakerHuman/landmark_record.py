@@ -0,0 +1,190 @@
+import os
+import time
+import logging
+
+import numpy as np
+
+from .hand import HandResult
+
+
+RECORD_MAGIC = b"PAMHREC1"
+RECORD_HEADER_DTYPE = np.dtype([("magic", "S8"), ("version", "<u2"), ("max_num_hands", "<u2"), ("reserved", "<u4")])
+RECORD_VERSION = 1
+
+# 정규좌표 1.0 = 16384, int16으로 -2.0 ~ 2.0 범위를 약 0.00006 간격으로 저장
+LANDMARK_SCALE = 16384
+SCORE_SCALE = 65535
+HAND_LABELS = ("Left", "Right")
+HAND_LABEL_UNKNOWN = 255
+
+
+def get_record_dtype(max_num_hands : int) -> np.dtype:
+    """프레임 1개의 고정 크기 레코드, 손이 max_num_hands보다 적으면 나머지 칸은 0
+    """
+    return np.dtype([("timestamp", "<f8")
+                    , ("shape", "<u2", (3,))
+                    , ("count", "u1")
+                    , ("labels", "u1", (max_num_hands,))
+                    , ("scores", "<u2", (max_num_hands,))
+                    , ("landmarks", "<i2", (max_num_hands, 21, 3))])
+
+
+def read_record_header(f) -> int:
+    header = np.frombuffer(f.read(RECORD_HEADER_DTYPE.itemsize), RECORD_HEADER_DTYPE)
+    if len(header) == 0 or header["magic"][0] != RECORD_MAGIC or header["version"][0] != RECORD_VERSION:
+        raise ValueError("landmark record 파일이 아닙니다")
+
+    return int(header["max_num_hands"][0])
+
+
+class LandmarkRecordWriter:
+    """HandResult를 프레임마다 고정 크기 레코드로 이어 붙이는 클래스
+    타임스탬프, 손 라벨, 점수, int16으로 양자화한 정규좌표 랜드마크를 저장
+    HandUtil.set_recorder로 붙이면 detect 결과가 모두 기록됨
+    """
+    def __init__(self, record_path : str, max_num_hands : int = 2):
+        self.record_path = record_path
+        self.logger = logging.debug
+
+        if os.path.isfile(record_path) and os.path.getsize(record_path) > 0:
+            # 기존 파일에 이어서 기록, 중간에 끊긴 레코드는 잘라냄
+            with open(record_path, "rb") as f:
+                max_num_hands = read_record_header(f)
+
+            self.record_dtype = get_record_dtype(max_num_hands)
+            size = os.path.getsize(record_path) - RECORD_HEADER_DTYPE.itemsize
+            self._file = open(record_path, "r+b")
+            self._file.truncate(RECORD_HEADER_DTYPE.itemsize + size // self.record_dtype.itemsize * self.record_dtype.itemsize)
+            self._file.seek(0, os.SEEK_END)
+        else:
+            self.record_dtype = get_record_dtype(max_num_hands)
+            self._file = open(record_path, "wb")
+            header = np.array([(RECORD_MAGIC, RECORD_VERSION, max_num_hands, 0)], RECORD_HEADER_DTYPE)
+            self._file.write(header.tobytes())
+
+        self.max_num_hands = max_num_hands
+        self._write_count = 0
+
+    def __del__(self):
+        pass
+
+    def set_logger(self, logger) -> None:
+        self.logger = logger
+
+    def log(self, log_message : str) -> None:
+        self.logger(f"[LandmarkRecordWriter] : {log_message}")
+
+    def write(self, result : HandResult, timestamp : float = None) -> None:
+        """result 1개를 기록, timestamp가 없으면 현재 시간
+        """
+        record = np.zeros(1, self.record_dtype)[0]
+        count = min(result.count(), self.max_num_hands)
+        if result.count() > self.max_num_hands:
+            self.log(f"[WARNING] {result.count()}개의 손 중 {self.max_num_hands}개만 기록")
+
+        record["timestamp"] = time.time() if timestamp is None else timestamp
+        record["shape"] = result.img_shape
+        record["count"] = count
+        if count:
+            landmarks = result.get_landmark_array()[:count]
+            record["landmarks"][:count] = np.clip(np.rint(landmarks * LANDMARK_SCALE), -32768, 32767)
+            record["scores"][:count] = np.rint(np.clip(result.handedness_scores[:count], 0, 1) * SCORE_SCALE)
+            record["labels"][:count] = [HAND_LABELS.index(label) if label in HAND_LABELS else HAND_LABEL_UNKNOWN
+                                        for label in result.handedness[:count]]
+
+        self._file.write(record.tobytes())
+        self._write_count += 1
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+            self.log(f"[INFO] write {self._write_count} records : {self.record_path}")
+
+
+class LandmarkRecordReader:
+    """LandmarkRecordWriter로 기록한 파일을 메모리 맵으로 읽는 클래스
+    인덱스나 반복으로 HandResult(from_arrays)를 돌려주며, 기록 중인 파일의 끊긴 마지막 레코드는 무시함
+    """
+    def __init__(self, record_path : str):
+        self.record_path = record_path
+        with open(record_path, "rb") as f:
+            self.max_num_hands = read_record_header(f)
+
+        self.record_dtype = get_record_dtype(self.max_num_hands)
+        count = (os.path.getsize(record_path) - RECORD_HEADER_DTYPE.itemsize) // self.record_dtype.itemsize
+        self.records = (np.memmap(record_path, self.record_dtype, "r", RECORD_HEADER_DTYPE.itemsize, (count,))
+                        if count else np.zeros(0, self.record_dtype))
+
+    def __del__(self):
+        pass
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, idx : int) -> HandResult:
+        return self.to_result(self.records[idx])
+
+    def __iter__(self):
+        for record in self.records:
+            yield self.to_result(record)
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return np.asarray(self.records["timestamp"])
+
+    @staticmethod
+    def to_result(record) -> HandResult:
+        count = int(record["count"])
+        labels = [HAND_LABELS[label] if label < len(HAND_LABELS) else "" for label in record["labels"][:count]]
+        landmarks = record["landmarks"][:count].astype(np.float32) / LANDMARK_SCALE
+        scores = record["scores"][:count].astype(np.float32) / SCORE_SCALE
+
+        return HandResult.from_arrays(tuple(record["shape"].tolist()), landmarks, labels, scores)
+
+    def replay(self):
+        """(타임스탬프, HandResult)를 기록된 순서대로 돌려주는 제너레이터
+        """
+        for record in self.records:
+            yield float(record["timestamp"]), self.to_result(record)
+
+
+class ReplayDetector:
+    """기록된 결과를 순서대로 돌려주는 HandUtil 대용, 입력 이미지는 무시함
+    HandTrainer.detector를 바꿔 끼우면 MediaPipe 없이 분류와 상태 처리를 반복 측정할 수 있음
+    기록이 끝나면 처음부터 다시 돌려줌
+    """
+    def __init__(self, reader : LandmarkRecordReader):
+        if len(reader) == 0:
+            raise ValueError("기록된 결과가 없습니다")
+
+        self.reader = reader
+        self.logger = logging.debug
+        self._idx = 0
+
+    def __del__(self):
+        pass
+
+    def set_logger(self, logger) -> None:
+        self.logger = logger
+
+    def reset(self) -> None:
+        pass
+
+    def get_stats(self) -> dict:
+        return {"frame" : self._idx, "detection" : 0, "tracking" : 0, "detection_ratio" : 0.0}
+
+    def detect(self, img : np.ndarray = None, timestamp : float = None) -> HandResult:
+        result = self.reader[self._idx % len(self.reader)]
+        self._idx += 1
+        return result
+
+    def extract(self, img : np.ndarray = None) -> tuple:
+        result = self.detect(img)
+        if result.count() == 0:
+            return tuple()
+
+        landmarks = result.get_box_landmark_array()
+        return result, [landmark.flatten() for landmark in landmarks]
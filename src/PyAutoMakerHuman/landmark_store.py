@@ -0,0 +1,164 @@
+import os
+import json
+import hashlib
+import logging
+
+import numpy as np
+
+from .hand import HandResult
+
+
+class LandmarkStore:
+    """이미지별 손 검출 결과를 저장하는 디스크 캐시
+    파일 경로, 크기, 수정시간, 내용 해시가 같다면 다시 검출하지 않음
+    이미지마다 맨 처음 발견된 손 1개의 랜드마크(21, 3), 라벨, 박스를 저장
+    npz 파일 1개에 열(column) 단위 배열로 저장하므로 한번에 읽어들임
+    검출기 설정(config)을 같이 저장하고, 설정이 바뀌면 저장된 결과를 모두 버림
+    """
+    COLUMNS = ("paths", "sizes", "mtimes", "hashes", "shapes", "founds"
+                , "landmarks", "labels", "scores", "boxes")
+
+    def __init__(self, store_path : str):
+        self.store_path = store_path
+        self.logger = logging.debug
+        self.config : dict = None
+        self._records = dict()
+        self._modified = False
+
+        if os.path.isfile(store_path):
+            self.load()
+
+    def __del__(self):
+        pass
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def set_logger(self, logger) -> None:
+        self.logger = logger
+
+    def log(self, log_message : str) -> None:
+        self.logger(f"[LandmarkStore] : {log_message}")
+
+    @staticmethod
+    def get_hash(file : str) -> str:
+        with open(file, "rb") as f:
+            return hashlib.blake2b(f.read(), digest_size = 16).hexdigest()
+
+    @staticmethod
+    def get_key(file : str) -> str:
+        return os.path.normcase(os.path.abspath(file))
+
+    def load(self) -> None:
+        with np.load(self.store_path, allow_pickle = False) as data:
+            columns = [data[name] for name in self.COLUMNS]
+            self.config = json.loads(str(data["config"])) if "config" in data.files else None
+
+        self._records = {path : record for path, *record in zip(*columns)}
+        self.log(f"[INFO] load {len(self._records)} records")
+
+    def set_config(self, config : dict) -> None:
+        """검출기 설정(HandUtil.get_file_config), 저장된 설정과 다르면 저장된 결과를 모두 버림
+        """
+        if config == self.config:
+            return
+
+        if self._records:
+            self.log(f"[INFO] detector config changed, drop {len(self._records)} records : {self.config} -> {config}")
+            self._records.clear()
+
+        self.config = config
+        self._modified = True
+
+    def retain(self, file_list : list) -> None:
+        """file_list에 없는 파일(데이터셋에서 지워진 파일)의 정보를 지움
+        """
+        keys = {self.get_key(file) for file in file_list}
+        removed = [key for key in self._records if key not in keys]
+        for key in removed:
+            del self._records[key]
+
+        if removed:
+            self._modified = True
+            self.log(f"[INFO] drop {len(removed)} records")
+
+    def save(self) -> None:
+        if not self._modified:
+            return
+
+        paths = list(self._records.keys())
+        records = list(zip(*self._records.values())) if paths else [[] for _ in self.COLUMNS[1:]]
+        columns = {"paths" : np.array(paths, dtype=str), "config" : np.array(json.dumps(self.config))}
+        dtypes = (np.int64, np.float64, str, np.int32, bool, np.float32, "<U5", np.float32, np.int32)
+        shapes = ((), (), (), (3,), (), (21, 3), (), (), (4,))
+        for name, column, dtype, shape in zip(self.COLUMNS[1:], records, dtypes, shapes):
+            columns[name] = np.array(column, dtype=dtype).reshape(-1, *shape)
+
+        # 저장 중에 중단되어도 기존 파일이 깨지지 않도록 임시 파일에 쓰고 교체
+        save_dir = os.path.dirname(os.path.abspath(self.store_path))
+        os.path.isdir(save_dir) or os.makedirs(save_dir)
+        temp_path = f"{self.store_path}.tmp"
+        with open(temp_path, "wb") as f:
+            np.savez(f, **columns)
+
+        os.replace(temp_path, self.store_path)
+        self._modified = False
+        self.log(f"[INFO] save {len(paths)} records")
+
+    def find_missing(self, file_list : list) -> list:
+        """저장된 정보가 없거나 내용이 바뀐 파일 목록을 리턴하는 함수
+        크기와 수정시간이 같다면 해시는 계산하지 않음
+        """
+        missing = []
+        for file in file_list:
+            record = self._records.get(self.get_key(file))
+            if record is None:
+                missing.append(file)
+                continue
+
+            stat = os.stat(file)
+            size, mtime, file_hash = record[:3]
+            if stat.st_size == size and stat.st_mtime == mtime:
+                continue
+
+            if stat.st_size == size and self.get_hash(file) == file_hash:
+                # 내용은 같고 수정시간만 바뀜
+                self._records[self.get_key(file)] = (stat.st_size, stat.st_mtime, *record[2:])
+                self._modified = True
+                continue
+
+            missing.append(file)
+
+        return missing
+
+    def update(self, file : str, result : HandResult) -> None:
+        stat = os.stat(file)
+        found = result.count() > 0
+        if found:
+            landmarks = result.get_landmark_array()[0]
+            label = result.handedness[0]
+            score = result.handedness_scores[0]
+            box = result.get_box_array()[0]
+        else:
+            landmarks = np.zeros((21, 3), np.float32)
+            label = ""
+            score = 0.0
+            box = np.zeros(4, np.int32)
+
+        self._records[self.get_key(file)] = (stat.st_size, stat.st_mtime, self.get_hash(file)
+                                            , np.asarray(result.img_shape, np.int32), found
+                                            , landmarks, label, score, box)
+        self._modified = True
+
+    def get(self, file : str) -> HandResult or None:
+        """저장된 정보로 HandResult를 만들어서 리턴하는 함수, 정보가 없다면 None
+        """
+        record = self._records.get(self.get_key(file))
+        if record is None:
+            return None
+
+        size, mtime, file_hash, shape, found, landmarks, label, score, box = record
+        if not found:
+            return HandResult.from_arrays(tuple(shape.tolist()), np.empty((0, 21, 3), np.float32), [])
+
+        return HandResult.from_arrays(tuple(shape.tolist()), landmarks[np.newaxis], [label], [score])
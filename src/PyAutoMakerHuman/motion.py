@@ -0,0 +1,174 @@
+import time
+
+import cv2
+import numpy as np
+
+from .hand import HandResult
+
+
+GATE_PROCESS = 0
+GATE_REUSE = 1
+GATE_SKIP = 2
+
+
+class MotionGate:
+    """손 검출 전에 줄인 프레임으로 움직임과 피부색 비율을 보고 검출을 건너뛸지 정하는 클래스
+    마지막으로 검출한 프레임과 비교해서
+    - 이전 결과에 손이 없고 피부색이 거의 없거나 화면이 그대로면 검출하지 않음 (GATE_SKIP, 빈 화면)
+    - 이전 결과에 손이 있고 화면 전체의 바뀐 픽셀 비율이 motion_threshold보다,
+      손 박스 안의 바뀐 픽셀 비율이 box_motion_threshold보다 작으면 이전 결과를 다시 씀 (GATE_REUSE)
+    - 그 외에는 검출함 (GATE_PROCESS)
+    손가락만 조금 움직이면 화면 전체에서는 거의 바뀌지 않으므로 손 박스는 따로 잘라서 box_width 크기로 비교함
+    max_reuse_frames 프레임 또는 max_reuse_time 초 동안 검출하지 않았다면 조건과 상관없이 검출함
+    """
+    def __init__(self, width : int = 80, pixel_threshold : int = 12, motion_threshold : float = 0.01
+                , skin_threshold : float = 0.005, max_reuse_frames : int = 5, max_reuse_time : float = 0.2
+                , box_width : int = 48, box_margin : float = 0.2, box_motion_threshold : float = 0.005):
+        """width : 화면 전체를 비교할 때 줄이는 가로 크기
+        pixel_threshold : 회색조 차이가 이 값보다 크면 바뀐 픽셀
+        motion_threshold : 바뀐 픽셀 비율이 이 값보다 작으면 정지 화면
+        skin_threshold : 피부색 픽셀 비율이 이 값보다 작으면 손이 없는 화면
+        max_reuse_frames, max_reuse_time : 이전 결과를 다시 쓸 수 있는 최대 프레임 수, 최대 시간(초)
+        box_width : 손 박스를 비교할 때 줄이는 크기 (box_width x box_width)
+        box_margin : 박스 바깥으로 움직인 손가락도 보도록 박스를 넓히는 비율
+        box_motion_threshold : 손 박스 안의 바뀐 픽셀 비율이 이 값보다 작으면 손이 그대로
+        """
+        self.width = width
+        self.pixel_threshold = pixel_threshold
+        self.motion_threshold = motion_threshold
+        self.skin_threshold = skin_threshold
+        self.max_reuse_frames = max_reuse_frames
+        self.max_reuse_time = max_reuse_time
+        self.box_width = box_width
+        self.box_margin = box_margin
+        self.box_motion_threshold = box_motion_threshold
+        self.reset()
+        self.reset_stats()
+
+    def __del__(self):
+        pass
+
+    def reset(self) -> None:
+        """비교 기준을 지움, 다음 프레임은 항상 검출함
+        """
+        self._reference = None
+        self._reference_time = 0.0
+        self._box_references = list()
+        self._result = None
+        self._reuse_count = 0
+        self.motion = 1.0
+        self.box_motion = 1.0
+        self.skin = 1.0
+
+    def reset_stats(self) -> None:
+        self._counts = [0, 0, 0]
+
+    def get_stats(self) -> dict:
+        """검출한(process), 이전 결과를 쓴(reuse), 빈 화면이라 건너뛴(skip) 프레임 수와 검출 비율
+        """
+        frame_count = sum(self._counts)
+        return {"frame" : frame_count
+                , "process" : self._counts[GATE_PROCESS]
+                , "reuse" : self._counts[GATE_REUSE]
+                , "skip" : self._counts[GATE_SKIP]
+                , "process_ratio" : self._counts[GATE_PROCESS] / frame_count if frame_count else 0.0
+                , "motion" : self.motion
+                , "box_motion" : self.box_motion
+                , "skin" : self.skin}
+
+    def get_motion(self, gray : np.ndarray, reference : np.ndarray or None) -> float:
+        """기준 프레임과 비교한 바뀐 픽셀 비율, 비교할 수 없으면 1.0
+        """
+        if reference is None or reference.shape != gray.shape:
+            return 1.0
+
+        diff = cv2.absdiff(gray, reference)
+        return float(np.count_nonzero(diff > self.pixel_threshold) / diff.size)
+
+    def measure(self, img : np.ndarray) -> tuple[np.ndarray, float, float]:
+        """(줄인 회색조 프레임, 바뀐 픽셀 비율, 피부색 픽셀 비율)
+        """
+        h, w = img.shape[:2]
+        small = cv2.resize(img, (self.width, max(int(h * self.width / w), 1)), interpolation = cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        motion = self.get_motion(gray, self._reference)
+
+        # YCrCb에서 자주 쓰는 피부색 범위
+        ycrcb = cv2.cvtColor(small, cv2.COLOR_BGR2YCrCb)
+        cr = ycrcb[..., 1]
+        cb = ycrcb[..., 2]
+        skin_mask = (cr >= 133) & (cr <= 173) & (cb >= 77) & (cb <= 127)
+        skin = float(np.count_nonzero(skin_mask) / skin_mask.size)
+
+        return gray, motion, skin
+
+    def crop_boxes(self, img : np.ndarray, hand_result : HandResult) -> list:
+        """손 박스마다 box_margin만큼 넓혀서 잘라낸 (x1, y1, x2, y2)와 box_width 크기 회색조 이미지
+        """
+        h, w = img.shape[:2]
+        crops = list()
+        for x, y, box_w, box_h in hand_result.get_box_array().tolist():
+            margin_x, margin_y = int(box_w * self.box_margin), int(box_h * self.box_margin)
+            x1, y1 = max(x - margin_x, 0), max(y - margin_y, 0)
+            x2, y2 = min(x + box_w + margin_x, w), min(y + box_h + margin_y, h)
+            if x2 <= x1 or y2 <= y1:
+                continue
+
+            crops.append(((x1, y1, x2, y2), self.resize_box(img[y1:y2, x1:x2])))
+
+        return crops
+
+    def resize_box(self, img : np.ndarray) -> np.ndarray:
+        small = cv2.resize(img, (self.box_width, self.box_width), interpolation = cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+    def measure_boxes(self, img : np.ndarray) -> float:
+        """마지막으로 검출한 손 박스 안에서 바뀐 픽셀 비율, 손이 여러개면 가장 큰 값
+        """
+        motions = [self.get_motion(self.resize_box(img[y1:y2, x1:x2]), reference)
+                    for (x1, y1, x2, y2), reference in self._box_references]
+
+        return max(motions, default = 1.0)
+
+    def reuse_expired(self, timestamp : float) -> bool:
+        return (self._reuse_count >= self.max_reuse_frames
+                or timestamp - self._reference_time >= self.max_reuse_time)
+
+    def check(self, img : np.ndarray, timestamp : float = None) -> int:
+        """GATE_PROCESS, GATE_REUSE, GATE_SKIP 중 하나, GATE_PROCESS면 기준 프레임을 이 프레임으로 바꿈
+        timestamp가 없으면 time.monotonic()을 사용
+        """
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        gray, self.motion, self.skin = self.measure(img)
+        self.box_motion = 1.0
+        if self._result is None or self.reuse_expired(timestamp):
+            decision = GATE_PROCESS
+        elif self._result.count() == 0:
+            still = self.skin < self.skin_threshold or self.motion < self.motion_threshold
+            decision = GATE_SKIP if still else GATE_PROCESS
+        elif self.motion < self.motion_threshold:
+            self.box_motion = self.measure_boxes(img)
+            decision = GATE_REUSE if self.box_motion < self.box_motion_threshold else GATE_PROCESS
+        else:
+            decision = GATE_PROCESS
+
+        if decision == GATE_PROCESS:
+            self._reference = gray
+            self._reference_time = timestamp
+            self._box_references = list()
+            self._reuse_count = 0
+        else:
+            self._reuse_count += 1
+
+        self._counts[decision] += 1
+        return decision
+
+    def detect(self, detector, img : np.ndarray, timestamp : float = None) -> HandResult:
+        """check 결과에 따라 detector.detect(img, timestamp)를 실행하거나 이전 결과를 리턴
+        detector는 HandUtil, HandTrainer처럼 detect(img, timestamp)가 있는 객체
+        """
+        if self.check(img, timestamp) == GATE_PROCESS:
+            self._result = detector.detect(img, timestamp)
+            self._box_references = self.crop_boxes(img, self._result)
+
+        return self._result
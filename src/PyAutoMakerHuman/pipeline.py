@@ -0,0 +1,187 @@
+import time
+import logging
+from collections import deque
+from queue import Empty
+from threading import Thread, Event, Condition, Lock
+
+
+class DropQueue:
+    """크기가 정해진 큐, 가득 찬 상태에서 넣으면 가장 오래된 항목을 버림
+    실시간 처리에서 뒤처진 프레임을 쌓아두지 않기 위해 사용
+    """
+    def __init__(self, maxsize : int = 1):
+        self._items = deque(maxlen = maxsize)
+        self._condition = Condition()
+        self._dropped_count = 0
+
+    def __del__(self):
+        pass
+
+    def put(self, item) -> None:
+        with self._condition:
+            if len(self._items) == self._items.maxlen:
+                self._dropped_count += 1
+
+            self._items.append(item)
+            self._condition.notify()
+
+    def get(self, timeout : float or None = None):
+        """가장 오래된 항목을 꺼내는 함수, timeout 동안 항목이 없다면 queue.Empty
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda : len(self._items) > 0, timeout):
+                raise Empty()
+
+            return self._items.popleft()
+
+    def clear(self) -> None:
+        with self._condition:
+            self._items.clear()
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    @property
+    def dropped_count(self) -> int:
+        return self._dropped_count
+
+
+class Stage(Thread):
+    """입력 큐의 항목을 처리 함수로 처리하고 결과를 출력 큐에 넣는 스레드
+    입력 큐가 없다면 처리 함수를 계속 호출함 (프레임을 가져오는 단계)
+    처리 함수가 None을 리턴하면 출력하지 않음
+    expected_exceptions는 잠깐 기다렸다가 다시 처리하는 예외 (프레임 대기 시간 초과 등)
+    stop_exceptions는 정상적으로 끝났다는 예외 (재생 소스의 끝 등), 오류로 기록하지 않음
+    그 외의 예외와 stop_exceptions는 error에 저장하고 on_error를 호출한 뒤 단계를 끝냄
+    """
+    GET_TIMEOUT = 0.1
+    # 지연시간 지수 이동 평균 가중치
+    LATENCY_ALPHA = 0.1
+
+    def __init__(self, name : str, func, input_queue : DropQueue = None, output_queue : DropQueue = None
+                , expected_exceptions : tuple = tuple(), stop_exceptions : tuple = tuple()):
+        super().__init__(name = name, daemon = True)
+        self.func = func
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.expected_exceptions = tuple(expected_exceptions)
+        self.stop_exceptions = tuple(stop_exceptions)
+        self.error : Exception = None
+        # 예외로 끝날 때 호출, Pipeline이 설정함
+        self.on_error = None
+        self._exit_event = Event()
+
+        self._count = 0
+        self._latency = 0.0
+        self._last_latency = 0.0
+
+    def __del__(self):
+        pass
+
+    def run(self) -> None:
+        logging.debug(f"[+] {self.name} 단계 시작")
+        while not self._exit_event.is_set():
+            item = None
+            if self.input_queue is not None:
+                try:
+                    item = self.input_queue.get(self.GET_TIMEOUT)
+                except Empty:
+                    continue
+
+            start_time = time.perf_counter()
+            try:
+                result = self.func(item)
+            except self.expected_exceptions as e:
+                logging.debug(f"[-] {self.name} 단계 예외 : {e!r}")
+                self._exit_event.wait(self.GET_TIMEOUT)
+                continue
+            except self.stop_exceptions as e:
+                logging.debug(f"[+] {self.name} 단계 정지 : {e!r}")
+                self.set_error(e)
+                break
+            except Exception as e:
+                logging.exception(f"[-] {self.name} 단계 오류로 종료")
+                self.set_error(e)
+                break
+
+            # 출력이 있는 단계에서 None은 처리한 항목이 없다는 뜻이므로 집계하지 않음
+            if result is None and self.output_queue is not None:
+                continue
+
+            self.update_stats(time.perf_counter() - start_time)
+            if self.output_queue is not None:
+                self.output_queue.put(result)
+
+        logging.debug(f"[+] {self.name} 단계 종료")
+
+    def set_error(self, error : Exception) -> None:
+        self.error = error
+        if self.on_error is not None:
+            self.on_error(self, error)
+
+    def update_stats(self, latency : float) -> None:
+        self._count += 1
+        self._last_latency = latency
+        self._latency = latency if self._count == 1 else \
+                        self._latency + self.LATENCY_ALPHA * (latency - self._latency)
+
+    def get_stats(self) -> dict:
+        """처리 횟수, 지연시간(ms, 평균과 마지막), 입력 큐의 대기 항목 수와 버려진 항목 수
+        """
+        return {"count" : self._count
+                , "latency" : self._latency * 1000
+                , "last_latency" : self._last_latency * 1000
+                , "queue" : self.input_queue.qsize() if self.input_queue else 0
+                , "dropped" : self.input_queue.dropped_count if self.input_queue else 0}
+
+    def exit(self) -> None:
+        self._exit_event.set()
+
+    def join(self, timeout = None) -> None:
+        self.exit()
+        if self.is_alive():
+            return super().join(timeout)
+
+
+class Pipeline:
+    """단계(Stage)들을 묶어서 시작, 종료, 통계를 관리하는 클래스
+    단계 1개가 오류로 끝나면 나머지 단계도 끝내고 처음 오류를 error에 저장함
+    결과를 기다리는 쪽은 raise_error로 확인해서 자기 스레드에서 다시 발생시킴
+    """
+    def __init__(self, stages : list):
+        self.stages = list(stages)
+        self.error : Exception = None
+        self._error_lock = Lock()
+        for stage in self.stages:
+            stage.on_error = self.stage_error
+
+    def __del__(self):
+        pass
+
+    def start(self) -> None:
+        for stage in self.stages:
+            stage.start()
+
+    def stage_error(self, stage : Stage, error : Exception) -> None:
+        with self._error_lock:
+            if self.error is None:
+                self.error = error
+
+        for other in self.stages:
+            other.exit()
+
+    def raise_error(self) -> None:
+        """오류로 끝난 단계가 있다면 그 예외를 다시 발생시킴
+        """
+        if self.error is not None:
+            raise self.error
+
+    def join(self, timeout = None) -> None:
+        for stage in self.stages:
+            stage.exit()
+
+        for stage in self.stages:
+            stage.join(timeout)
+
+    def get_stats(self) -> dict:
+        return {stage.name : stage.get_stats() for stage in self.stages}
@@ -0,0 +1,349 @@
+import os
+import json
+import time
+import socket
+import asyncio
+import logging
+import argparse
+from collections import deque
+
+import numpy as np
+
+from . import models_dir
+from .train import SvmUtil
+
+
+FEATURE_SIZE = 21 * 3
+# 요청 1줄의 최대 크기(바이트), asyncio 기본값(64KiB)은 손 수백개를 보내는 요청보다 작음
+LINE_LIMIT = 8 * 1024 * 1024
+
+
+class MicroBatcher:
+    """여러 세션의 요청을 latency_budget(초) 동안 모아서 predict_proba 1번으로 처리하는 클래스
+    요청은 들어온 순서대로 처리되고 결과도 같은 순서로 채워짐
+    """
+    def __init__(self, trainer : SvmUtil, latency_budget : float = 0.005, max_batch_size : int = 256):
+        self.trainer = trainer
+        self.latency_budget = latency_budget
+        self.max_batch_size = max_batch_size
+        self._queue : asyncio.Queue = None
+        self._error : Exception = None
+
+        self._start_time = time.perf_counter()
+        self._request_count = 0
+        self._row_count = 0
+        self._batch_count = 0
+        self._latency_sum = 0.0
+        self._latency_max = 0.0
+
+    def __del__(self):
+        pass
+
+    async def submit(self, datas : np.ndarray) -> tuple:
+        """(행 갯수, 63) 데이터를 배치에 넣고 SvmUtil.predict 형태의 결과를 기다림
+        배치 처리(run)가 오류로 멈췄다면 그 예외가 발생함
+        """
+        if self._error is not None:
+            raise self._error
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((time.perf_counter(), datas, future))
+        return await future
+
+    async def run(self) -> None:
+        self._queue = asyncio.Queue()
+        self._error = None
+        loop = asyncio.get_running_loop()
+        batch = list()
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                row_count = len(batch[0][1])
+                deadline = loop.time() + self.latency_budget
+
+                while row_count < self.max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+
+                    batch.append(item)
+                    row_count += len(item[1])
+
+                await self.process(batch)
+        except Exception as e:
+            # 처리 중이던 배치와 대기중인 요청이 영원히 기다리지 않도록 모두 실패시킴
+            self._error = e
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            self.fail_batch(batch, e)
+            raise
+
+    def fail_batch(self, batch : list, error : Exception) -> None:
+        for _, _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    async def process(self, batch : list) -> None:
+        """배치를 추론해서 요청마다 결과를 채움, 처리 중 예외가 나면 배치의 모든 요청에 예외를 전달
+        """
+        try:
+            datas = np.concatenate([datas for _, datas, _ in batch])
+            # 추론하는 동안에도 요청을 받을 수 있도록 다른 스레드에서 처리
+            results = await asyncio.get_running_loop().run_in_executor(None, self.trainer.predict_proba, datas)
+
+            item_results = list()
+            offset = 0
+            for _, item_datas, _ in batch:
+                item_results.append(self.trainer.proba_to_predict(results[offset:offset + len(item_datas)]))
+                offset += len(item_datas)
+        except Exception as e:
+            self.fail_batch(batch, e)
+            return
+
+        end_time = time.perf_counter()
+        for (submit_time, _, future), item_result in zip(batch, item_results):
+            if not future.done():
+                future.set_result(item_result)
+
+            latency = end_time - submit_time
+            self._latency_sum += latency
+            self._latency_max = max(self._latency_max, latency)
+
+        self._request_count += len(batch)
+        self._row_count += len(datas)
+        self._batch_count += 1
+
+    def get_stats(self) -> dict:
+        """처리한 요청, 데이터(손), 배치 수와 초당 처리량, 요청 지연시간(ms)
+        """
+        elapsed = time.perf_counter() - self._start_time
+        request_count = max(self._request_count, 1)
+        return {"requests" : self._request_count
+                , "rows" : self._row_count
+                , "batches" : self._batch_count
+                , "batch_size" : self._row_count / max(self._batch_count, 1)
+                , "requests_per_sec" : self._request_count / elapsed
+                , "latency" : self._latency_sum / request_count * 1000
+                , "latency_max" : self._latency_max * 1000
+                , "queue" : self._queue.qsize() if self._queue else 0}
+
+
+class ClassifyServer:
+    """HandUtil.extract로 만든 데이터를 받아서 SvmUtil.predict 결과를 돌려주는 asyncio 서버
+    연결 1개가 세션 1개, 한 줄에 JSON 1개
+    요청 : {"id" : 임의의 값, "data" : [63개] 또는 [[63개], ...]}, 통계는 {"id" : ..., "stats" : true}
+    응답 : {"id" : ..., "result" : [[라벨, 확률], ...]} 또는 {"id" : ..., "error" : 메세지}
+    세션마다 응답은 요청 순서대로 보냄
+    line_limit보다 긴 줄이 오면 오류를 응답하고 세션을 닫음
+    """
+    def __init__(self, trainer : SvmUtil, latency_budget : float = 0.005, max_batch_size : int = 256
+                , line_limit : int = LINE_LIMIT):
+        self.batcher = MicroBatcher(trainer, latency_budget, max_batch_size)
+        self.line_limit = line_limit
+        self._session_count = 0
+        self._active_session_count = 0
+
+    def __del__(self):
+        pass
+
+    def parse_request(self, line : bytes) -> tuple:
+        request = json.loads(line)
+        if request.get("stats"):
+            return request.get("id"), None
+
+        datas = np.asarray(request["data"], dtype=np.float64)
+        if datas.ndim == 1:
+            datas = datas[None]
+
+        if datas.ndim != 2 or datas.shape[1] != FEATURE_SIZE:
+            raise ValueError(f"data shape must be (n, {FEATURE_SIZE}) : {datas.shape}")
+
+        return request.get("id"), datas
+
+    async def handle_request(self, request_id, datas : np.ndarray or None) -> dict:
+        if datas is None:
+            return {"id" : request_id, "stats" : self.get_stats()}
+
+        if len(datas) == 0:
+            return {"id" : request_id, "result" : list()}
+
+        try:
+            result = await self.batcher.submit(datas)
+        except Exception as e:
+            return {"id" : request_id, "error" : repr(e)}
+
+        return {"id" : request_id, "result" : [list(item) for item in result]}
+
+    async def handle_session(self, reader : asyncio.StreamReader, writer : asyncio.StreamWriter) -> None:
+        self._session_count += 1
+        self._active_session_count += 1
+        pending = deque()
+        pending_event = asyncio.Event()
+        closed = False
+
+        async def write_responses():
+            # 요청 순서대로 응답을 기다려서 보냄
+            while not closed or pending:
+                if not pending:
+                    pending_event.clear()
+                    await pending_event.wait()
+                    continue
+
+                response = await pending.popleft()
+                writer.write(json.dumps(response, ensure_ascii=False).encode() + b"\n")
+                await writer.drain()
+
+        def add_error(message : str) -> None:
+            task = asyncio.get_running_loop().create_future()
+            task.set_result({"id" : None, "error" : message})
+            pending.append(task)
+            pending_event.set()
+
+        writer_task = asyncio.create_task(write_responses())
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    # 줄 경계를 잃어버려서 다음 요청을 읽을 수 없으므로 오류를 보내고 세션을 닫음
+                    add_error(f"request line exceeds {self.line_limit} bytes")
+                    break
+
+                if not line:
+                    break
+
+                try:
+                    request_id, datas = self.parse_request(line)
+                except Exception as e:
+                    add_error(repr(e))
+                    continue
+
+                pending.append(asyncio.ensure_future(self.handle_request(request_id, datas)))
+                pending_event.set()
+
+            closed = True
+            pending_event.set()
+            await writer_task
+        except ConnectionError:
+            pass
+        finally:
+            self._active_session_count -= 1
+            writer_task.cancel()
+            for task in pending:
+                task.cancel()
+
+            # 취소된 작업의 CancelledError는 여기서 끝내고, 이 세션이 취소된 경우는 그대로 올라감
+            await asyncio.gather(writer_task, *pending, return_exceptions = True)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    def get_stats(self) -> dict:
+        stats = self.batcher.get_stats()
+        stats.update({"sessions" : self._session_count, "active_sessions" : self._active_session_count})
+        return stats
+
+    async def serve(self, host : str = "127.0.0.1", port : int = 8765, unix_path : str = None) -> None:
+        batcher_task = asyncio.create_task(self.batcher.run())
+        # 배치 큐가 먼저 만들어지도록 한번 양보
+        await asyncio.sleep(0)
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_session, unix_path, limit = self.line_limit)
+        else:
+            server = await asyncio.start_server(self.handle_session, host, port, limit = self.line_limit)
+
+        def batcher_done(task : asyncio.Task) -> None:
+            # 배치 처리가 멈추면 요청이 영원히 대기하므로 서버도 멈춤
+            if task.cancelled():
+                return
+
+            logging.error(f"[-] micro batcher stopped : {task.exception()!r}")
+            server.close()
+
+        batcher_task.add_done_callback(batcher_done)
+        logging.info(f"[+] classify server : {unix_path or f'{host}:{port}'}")
+        try:
+            async with server:
+                await server.serve_forever()
+        except asyncio.CancelledError:
+            if not batcher_task.done() or batcher_task.cancelled():
+                raise
+
+            raise RuntimeError("micro batcher stopped") from batcher_task.exception()
+        finally:
+            batcher_task.cancel()
+
+
+class ClassifyClient:
+    """ClassifyServer용 동기 클라이언트, predict는 SvmUtil.predict와 같은 형태를 리턴
+    """
+    def __init__(self, host : str = "127.0.0.1", port : int = 8765, unix_path : str = None):
+        if unix_path:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.connect(unix_path)
+        else:
+            self._socket = socket.create_connection((host, port))
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        self._file = self._socket.makefile("rwb")
+        self._request_id = 0
+
+    def __del__(self):
+        pass
+
+    def request(self, request : dict) -> dict:
+        self._request_id += 1
+        request["id"] = self._request_id
+        self._file.write(json.dumps(request).encode() + b"\n")
+        self._file.flush()
+
+        response = json.loads(self._file.readline())
+        if "error" in response:
+            raise ValueError(response["error"])
+
+        return response
+
+    def predict(self, datas) -> tuple:
+        datas = np.asarray(datas, dtype=np.float64).reshape(-1, FEATURE_SIZE)
+        response = self.request({"data" : datas.tolist()})
+        return tuple((name, proba) for name, proba in response["result"])
+
+    def get_stats(self) -> dict:
+        return self.request({"stats" : True})["stats"]
+
+    def close(self) -> None:
+        self._file.close()
+        self._socket.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="수형 분류 서버")
+    parser.add_argument("--model", default=os.path.join(models_dir, "model"))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="unix 소켓 경로, 있으면 TCP 대신 사용")
+    parser.add_argument("--budget-ms", type=float, default=5.0, help="배치를 모으는 최대 시간")
+    parser.add_argument("--max-batch", type=int, default=256)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    trainer = SvmUtil()
+    trainer.load_svm(args.model)
+
+    server = ClassifyServer(trainer, args.budget_ms / 1000, args.max_batch)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import sys
+import time
+import logging
+import builtins
+import importlib
+import importlib.util
+from threading import Thread, Lock, local, current_thread
+
+
+# 카메라 선택 창이 떠있는 동안 미리 불러올 모듈, 상대 경로는 이 패키지 기준
+WARM_UP_MODULES = ("numpy", "cv2", "PIL.Image", "PIL.ImageFont", "mediapipe", ".engine")
+REPORT_IMPORT_COUNT = 25
+REPORT_MIN_TIME = 1.0
+
+
+class StartupProfiler:
+    """시작할 때 걸리는 시간을 import(모듈 단위)와 구간(모델 로드 등)으로 나눠서 기록하는 클래스
+    install하면 builtins.__import__를 감싸서 새 모듈을 불러온 import 문마다 시간을 잼
+    import 시간은 안쪽 import를 포함한 시간(total)과 뺀 시간(self)을 같이 기록
+    구간은 install과 상관없이 항상 기록됨
+    """
+    def __init__(self):
+        self._start_time = time.perf_counter()
+        self._lock = Lock()
+        self._local = local()
+        self._original_import = None
+        self.imports = list()
+        self.sections = list()
+
+    def __del__(self):
+        pass
+
+    @property
+    def installed(self) -> bool:
+        return self._original_import is not None
+
+    def install(self) -> None:
+        if self.installed:
+            return
+
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+
+    def uninstall(self) -> None:
+        if not self.installed:
+            return
+
+        builtins.__import__ = self._original_import
+        self._original_import = None
+
+    def elapsed(self) -> float:
+        """profiler를 만든 뒤 지난 시간(ms)
+        """
+        return (time.perf_counter() - self._start_time) * 1000
+
+    def _import(self, name, globals = None, locals = None, fromlist = (), level = 0):
+        return self.timed_import(lambda : self.resolve_name(name, globals, level)
+                                , self._original_import, name, globals, locals, fromlist, level)
+
+    def import_module(self, name : str, package : str = None):
+        """importlib.import_module을 시간을 기록하면서 실행 (install하지 않아도 기록됨)
+        """
+        return self.timed_import(lambda : importlib.util.resolve_name(name, package)
+                                , importlib.import_module, name, package)
+
+    def timed_import(self, get_name, import_func, *args):
+        stack = self._local.__dict__.setdefault("stack", list())
+        module_count = len(sys.modules)
+        stack.append(0.0)
+        start_time = time.perf_counter()
+        try:
+            return import_func(*args)
+        finally:
+            elapsed = (time.perf_counter() - start_time) * 1000
+            child_time = stack.pop()
+            # 새로 불러온 모듈이 없으면 이미 불러온 모듈이라 기록하지 않음
+            if len(sys.modules) > module_count:
+                if stack:
+                    stack[-1] += elapsed
+
+                with self._lock:
+                    self.imports.append({"name" : get_name()
+                                        , "thread" : current_thread().name
+                                        , "total" : elapsed
+                                        , "self" : elapsed - child_time})
+
+    @staticmethod
+    def resolve_name(name : str, globals : dict, level : int) -> str:
+        if level == 0 or not globals:
+            return name
+
+        base = (globals.get("__package__") or "").rsplit(".", level - 1)[0]
+        return f"{base}.{name}" if name else base
+
+    def section(self, name : str) -> "ProfileSection":
+        """with 문으로 감싼 구간의 시간을 기록
+        """
+        return ProfileSection(self, name)
+
+    def add_section(self, name : str, start_time : float, elapsed : float) -> None:
+        with self._lock:
+            self.sections.append({"name" : name
+                                , "thread" : current_thread().name
+                                , "start" : (start_time - self._start_time) * 1000
+                                , "elapsed" : elapsed})
+
+    def report(self, exclude_sections : tuple = tuple()) -> str:
+        """import는 self 시간이 긴 순서로, 구간은 시작한 순서로 정리한 문자열
+        exclude_sections에 있는 구간(사용자 입력 대기 등)은 전체 시간에서 뺌
+        """
+        total = self.elapsed()
+        with self._lock:
+            # 같은 모듈을 여러 import 문에서 나눠서 불러온 경우는 합쳐서 보여줌
+            merged = dict()
+            for item in self.imports:
+                key = (item["name"], item["thread"])
+                if key in merged:
+                    merged[key] = dict(merged[key], total = merged[key]["total"] + item["total"]
+                                    , self = merged[key]["self"] + item["self"])
+                else:
+                    merged[key] = item
+
+            imports = sorted(merged.values(), key = lambda item : item["self"], reverse = True)
+            sections = sorted(self.sections, key = lambda item : item["start"])
+
+        excluded = sum(section["elapsed"] for section in sections if section["name"] in exclude_sections)
+        lines = [f"startup : {total - excluded:.1f}ms" + (f" (대기 {excluded:.1f}ms 제외)" if excluded else "")]
+
+        import_time = {}
+        for item in imports:
+            import_time[item["thread"]] = import_time.get(item["thread"], 0.0) + item["self"]
+
+        lines.append("import : " + ", ".join(f"{thread} {elapsed:.1f}ms" for thread, elapsed in import_time.items()))
+        lines.append(f"  {'self(ms)':>9} {'total(ms)':>9}  {'thread':<12} module")
+        for item in imports[:REPORT_IMPORT_COUNT]:
+            if item["self"] < REPORT_MIN_TIME:
+                break
+
+            lines.append(f"  {item['self']:9.1f} {item['total']:9.1f}  {item['thread']:<12} {item['name']}")
+
+        lines.append("section :")
+        lines.append(f"  {'start(ms)':>9} {'time(ms)':>9}  {'thread':<12} name")
+        for section in sections:
+            lines.append(f"  {section['start']:9.1f} {section['elapsed']:9.1f}  {section['thread']:<12} {section['name']}")
+
+        return "\n".join(lines)
+
+
+class ProfileSection:
+    def __init__(self, profiler : StartupProfiler, name : str):
+        self.profiler = profiler
+        self.name = name
+        self._start_time = None
+
+    def __enter__(self) -> "ProfileSection":
+        self._start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        elapsed = (time.perf_counter() - self._start_time) * 1000
+        self.profiler.add_section(self.name, self._start_time, elapsed)
+
+
+# 프로세스에 1개, 모델 로드 같은 구간은 여기에 기록
+profiler = StartupProfiler()
+
+
+class WarmUp(Thread):
+    """무거운 모듈과 모델을 미리 불러오는 백그라운드 스레드
+    카메라 선택 창처럼 사용자를 기다리는 동안 실행해서 학습, 시험 창이 뜨는 시간을 줄임
+    메인 스레드에서 같은 모듈을 import하면 import 락 때문에 여기서 끝날 때까지 기다림
+    """
+    def __init__(self, modules : tuple = WARM_UP_MODULES, preload = None):
+        super().__init__(name = "warm_up", daemon = True)
+        self.modules = modules
+        self.preload = preload
+        self.errors = list()
+
+    def __del__(self):
+        pass
+
+    def run(self) -> None:
+        with profiler.section("warm up"):
+            for module in self.modules:
+                try:
+                    profiler.import_module(module, __package__)
+                except Exception as e:
+                    # 미리 불러오기만 실패한 것이므로 실제로 쓸 때 다시 시도됨
+                    self.errors.append((module, e))
+                    logging.debug(f"[+] warm up import 실패 : {module}, {e}")
+
+            if self.preload:
+                try:
+                    self.preload()
+                except Exception as e:
+                    self.errors.append(("preload", e))
+                    logging.debug(f"[+] warm up preload 실패 : {e}")
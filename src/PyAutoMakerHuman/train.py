@@ -1,13 +1,186 @@
 import os
 import pickle
+import hashlib
 import numpy as np
-from sklearn.preprocessing import LabelEncoder
-from sklearn.svm import SVC
+
+
+LINEAR_MODEL_FILE = "linear_model.npz"
+PICKLE_MODEL_FILES = ("svm_model", "le")
+
+
+def get_pickle_hash(model_path : str) -> str:
+    """model_path의 pickle 모델 파일(svm_model, le) 내용의 sha256, svm_model이 없으면 빈 문자열
+    linear_model.npz가 어떤 pickle에서 변환됐는지 확인하는 용도
+    """
+    if not os.path.isfile(os.path.join(model_path, PICKLE_MODEL_FILES[0])):
+        return ""
+
+    sha = hashlib.sha256()
+    for file_name in PICKLE_MODEL_FILES:
+        file_path = os.path.join(model_path, file_name)
+        if os.path.isfile(file_path):
+            with open(file_path, "rb") as f:
+                sha.update(f.read())
+
+    return sha.hexdigest()
+
+
+def couple_proba(pairwise_proba : np.ndarray) -> np.ndarray:
+    """1:1 확률(n, k, k)을 클래스별 확률(n, k)로 결합하는 함수
+    pairwise_proba[:, i, j] : i가 j를 이길 확률
+    libsvm의 multiclass_probability(Wu, Lin, Weng 2004)와 같은 문제
+    min p^T Q p, sum(p) = 1 을 반복법 대신 선형 방정식으로 한번에 풂
+    libsvm은 오차 0.005 / k 에서 반복을 멈추므로 결과는 1e-4 정도 차이날 수 있음
+    """
+    r = pairwise_proba.astype(np.float64)
+    n, k = r.shape[:2]
+    diag = np.arange(k)
+    r[:, diag, diag] = 0
+
+    # Q[t][t] = sum(r[j][t]^2), Q[t][j] = -r[j][t] * r[t][j]
+    system = np.zeros((n, k + 1, k + 1))
+    system[:, :k, :k] = -r.transpose(0, 2, 1) * r
+    system[:, diag, diag] = (r ** 2).sum(axis=1)
+    system[:, k, :k] = 1
+    system[:, :k, k] = 1
+
+    target = np.zeros((n, k + 1, 1))
+    target[:, k] = 1
+
+    p = np.linalg.solve(system, target)[:, :k, 0]
+    return np.clip(p, 0, None) / np.clip(p, 0, None).sum(axis=1, keepdims=True)
+
+
+class LinearSvm:
+    """선형 커널 SVC를 1:1 가중치 행렬과 Platt 파라미터로 바꾼 추론기
+    행렬곱 1번과 확률 결합으로 SVC.predict_proba와 같은 결과를 계산하며 sklearn이 필요없음
+    """
+    MIN_PROB = 1e-7
+
+    def __init__(self, coef : np.ndarray, intercept : np.ndarray, prob_a : np.ndarray,
+                prob_b : np.ndarray, classes : np.ndarray, source_hash : str = ""):
+        # 쌍 p = (i, j), i < j 순서, 결정값이 양수면 i
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = np.asarray(intercept, dtype=np.float64)
+        self.prob_a = np.asarray(prob_a, dtype=np.float64)
+        self.prob_b = np.asarray(prob_b, dtype=np.float64)
+        self.classes_ = np.asarray(classes)
+        # 변환한 pickle 파일의 get_pickle_hash 값
+        self.source_hash = source_hash
+
+        class_count = len(self.classes_)
+        self.pairs = np.array([(i, j) for i in range(class_count) for j in range(i + 1, class_count)]
+                                , dtype=np.intp).reshape(-1, 2)
+        self._target_cache = dict()
+
+    def __del__(self):
+        pass
+
+    @classmethod
+    def from_svc(cls, model, classes : np.ndarray, source_hash : str = "") -> "LinearSvm":
+        """학습된 SVC(kernel="linear", probability=True)로 추론기를 만드는 함수
+        classes : model.classes_ 순서의 라벨
+        source_hash : model을 불러온 pickle의 get_pickle_hash 값
+        """
+        if model.kernel != "linear":
+            raise ValueError("선형 커널 모델만 변환할 수 있습니다")
+
+        coef = model.coef_
+        coef = coef.toarray() if hasattr(coef, "toarray") else np.asarray(coef)
+        intercept = np.asarray(model.intercept_)
+        if len(classes) == 2:
+            # sklearn은 2클래스일 때 결정값의 부호를 뒤집어서 저장함
+            coef, intercept = -coef, -intercept
+
+        return cls(coef, intercept, model.probA_, model.probB_, classes, source_hash)
+
+    @classmethod
+    def load(cls, load_path : str) -> "LinearSvm":
+        with np.load(load_path, allow_pickle = False) as data:
+            source_hash = str(data["source_hash"]) if "source_hash" in data.files else ""
+            return cls(data["coef"], data["intercept"], data["prob_a"], data["prob_b"], data["classes"]
+                        , source_hash)
+
+    def save(self, save_path : str) -> None:
+        with open(save_path, "wb") as f:
+            np.savez(f, coef = self.coef, intercept = self.intercept, prob_a = self.prob_a
+                    , prob_b = self.prob_b, classes = self.classes_, source_hash = np.array(self.source_hash))
+
+    def decision_function(self, data) -> np.ndarray:
+        """(n, 쌍 갯수) 1:1 결정값
+        """
+        data = np.asarray(data, dtype=np.float64).reshape(-1, self.coef.shape[1])
+        return data @ self.coef.T + self.intercept
+
+    def pairwise_proba(self, decision : np.ndarray, pair_index : np.ndarray = None) -> np.ndarray:
+        """결정값에 Platt 스케일링을 적용해서 쌍의 첫번째 클래스가 이길 확률을 리턴하는 함수
+        """
+        pair_index = slice(None) if pair_index is None else pair_index
+        fApB = decision * self.prob_a[pair_index] + self.prob_b[pair_index]
+        with np.errstate(over="ignore"):
+            proba = 1.0 / (1.0 + np.exp(fApB))
+
+        return np.clip(proba, self.MIN_PROB, 1 - self.MIN_PROB)
+
+    def predict_proba(self, data) -> np.ndarray:
+        proba = self.pairwise_proba(self.decision_function(data))
+        n, k = proba.shape[0], len(self.classes_)
+        first, second = self.pairs[:, 0], self.pairs[:, 1]
+
+        pairwise = np.zeros((n, k, k))
+        pairwise[:, first, second] = proba
+        pairwise[:, second, first] = 1 - proba
+
+        return couple_proba(pairwise)
+
+    def get_target_model(self, target_index : int) -> tuple:
+        """target 클래스가 포함된 쌍의 (가중치, 편향, 쌍 인덱스, 부호)를 리턴하는 함수
+        부호는 쌍의 첫번째 클래스가 target이면 1, 두번째면 -1
+        """
+        target_model = self._target_cache.get(target_index)
+        if target_model is None:
+            pair_index = np.flatnonzero((self.pairs == target_index).any(axis=1))
+            sign = np.where(self.pairs[pair_index, 0] == target_index, 1.0, -1.0)
+            target_model = (np.ascontiguousarray(self.coef[pair_index]), self.intercept[pair_index]
+                            , pair_index, sign)
+            self._target_cache[target_index] = target_model
+
+        return target_model
+
+    def verify(self, data, target_index : int) -> tuple[np.ndarray, np.ndarray]:
+        """target 클래스가 포함된 k - 1개의 쌍만 계산해서 (통과 여부, 점수)를 리턴하는 함수
+        통과 : target이 모든 1:1 비교에서 이김 (1:1 투표의 승자)
+        결합 확률(predict_proba)의 argmax와 다를 수 있으므로 SvmUtil.verify에서 pairwise=True일 때만 사용
+        점수 : target의 확률 추정값, PKPD(Price et al. 1995) 1 / (sum(1 / r_tj) - (k - 2))
+        """
+        coef, intercept, pair_index, sign = self.get_target_model(target_index)
+        data = np.asarray(data, dtype=np.float64).reshape(-1, coef.shape[1])
+
+        proba = self.pairwise_proba(data @ coef.T + intercept, pair_index)
+        # target이 이길 확률
+        proba = np.where(sign > 0, proba, 1 - proba)
+
+        passed = (proba > 0.5).all(axis=1)
+        score = 1.0 / ((1.0 / proba).sum(axis=1) - (len(self.classes_) - 2))
+
+        return passed, np.clip(score, 0, 1)
+
+    def predict(self, data) -> np.ndarray:
+        """1:1 투표로 라벨을 리턴하는 함수 (SVC.predict와 같음)
+        """
+        decision = self.decision_function(data)
+        winners = np.where(decision > 0, self.pairs[:, 0], self.pairs[:, 1])
+        votes = np.apply_along_axis(np.bincount, 1, winners, minlength = len(self.classes_))
+
+        return self.classes_[votes.argmax(axis=1)]
 
 
 class SvmUtil:
     def __init__(self):
         self.logger = print
+        self.model = None
+        self.le = None
+        self.linear : LinearSvm = None
 
     def __del__(self):
         pass
@@ -18,7 +191,10 @@ class SvmUtil:
     def log(self, log_message : str) -> None:
         self.logger(log_message)
 
-    def train_svm(self, data : list, label : list) -> SVC:
+    def train_svm(self, data : list, label : list):
+        from sklearn.preprocessing import LabelEncoder
+        from sklearn.svm import SVC
+
         self.le = LabelEncoder()
         labels = self.le.fit_transform(label)
         
@@ -27,34 +203,131 @@ class SvmUtil:
         self.model.fit(data, labels)
         self.logger("[INFO] train end")
 
+        self.linear = LinearSvm.from_svc(self.model, self.le.classes_[self.model.classes_])
         return self.model
 
     def save_svm(self, save_path : str) -> None:
         if not os.path.isdir(save_path):
             os.makedirs(save_path)
 
-        with open(os.path.join(save_path, "svm_model"), "wb") as f:
-            f.write(pickle.dumps(self.model))
-            f.close()
+        if self.model is not None:
+            with open(os.path.join(save_path, "svm_model"), "wb") as f:
+                f.write(pickle.dumps(self.model))
+                f.close()
+
+            with open(os.path.join(save_path, "le"), "wb") as f:
+                f.write(pickle.dumps(self.le))
+                f.close()
+
+        if self.linear is not None:
+            if self.model is not None:
+                self.linear.source_hash = get_pickle_hash(save_path)
 
-        with open(os.path.join(save_path, "le"), "wb") as f:
-            f.write(pickle.dumps(self.le))
-            f.close()
+            self.linear.save(os.path.join(save_path, LINEAR_MODEL_FILE))
 
     def load_svm(self, load_path : str) -> None:
+        """변환된 선형 모델(linear_model.npz)이 있다면 sklearn 없이 불러옴
+        같은 폴더의 pickle이 변환할 때와 다르다면 (다시 학습해서 pickle만 바뀐 경우)
+        pickle로 불러오고 linear_model.npz를 다시 만듬
+        """
+        linear_path = os.path.join(load_path, LINEAR_MODEL_FILE)
+        pickle_hash = get_pickle_hash(load_path)
+        stale = False
+        if os.path.isfile(linear_path):
+            linear = LinearSvm.load(linear_path)
+            if not pickle_hash or linear.source_hash == pickle_hash:
+                self.model = None
+                self.le = None
+                self.linear = linear
+                return
+
+            stale = True
+            self.log(f"[WARNING] {LINEAR_MODEL_FILE} is not compiled from current svm_model : {load_path}")
+
         self.model = pickle.loads(open(os.path.join(load_path, "svm_model"), "rb").read())
         self.le = pickle.loads(open(os.path.join(load_path, "le"), "rb").read())
+        self.linear = None
+        if self.model.kernel == "linear":
+            self.linear = LinearSvm.from_svc(self.model, self.le.classes_[self.model.classes_], pickle_hash)
+
+        if stale:
+            try:
+                if self.linear is not None:
+                    self.linear.save(linear_path)
+                else:
+                    os.remove(linear_path)
+
+                self.log(f"[INFO] recompile : {linear_path}")
+            except OSError as e:
+                self.log(f"[WARNING] recompile fail : {linear_path}, {e!r}")
+
+    def compile_svm(self, model_path : str) -> None:
+        """pickle로 저장된 선형 모델을 linear_model.npz로 변환해서 같은 폴더에 저장
+        """
+        self.load_svm(model_path)
+        if self.linear is None:
+            raise ValueError("선형 커널 모델만 변환할 수 있습니다")
+
+        self.linear.source_hash = get_pickle_hash(model_path)
+        self.linear.save(os.path.join(model_path, LINEAR_MODEL_FILE))
+
+    def predict_proba(self, data) -> np.ndarray:
+        if self.linear is not None:
+            return self.linear.predict_proba(data)
+
+        return self.model.predict_proba(data)
 
     def predict(self, data) -> tuple:
-        results = self.model.predict_proba(data)
+        return self.proba_to_predict(self.predict_proba(data))
+
+    def proba_to_predict(self, results : np.ndarray) -> tuple:
+        """predict_proba 결과를 ((라벨, 확률), ...)로 바꾸는 함수
+        """
         indexes = [np.argmax(result) for result in results]
 
+        labels = self.get_labels()
         probabilities = [float(result[idx]) for result, idx in zip(results, indexes)]
-        names = [str(self.le.classes_[idx]) for idx in indexes]
+        names = [str(labels[idx]) for idx in indexes]
 
         return tuple(zip(names, probabilities))
 
+    def verify(self, data, target_label : str, thresh : float = 0.0, pairwise : bool = False) -> tuple:
+        """데이터가 target_label인지만 확인해서 ((통과 여부, 점수), ...)를 리턴하는 함수
+        통과 : predict와 같이 결합 확률이 가장 큰 클래스가 target, 점수 : target의 결합 확률
+        pairwise가 True면 target이 포함된 k - 1개의 1:1 결정함수만 계산해서 predict보다 가벼움 (LinearSvm.verify)
+        이때는 target이 모든 1:1 비교에서 이겨야 통과하므로 predict와 결과가 다를 수 있음
+        선형 모델이 아니면 pairwise와 상관없이 predict 결과로 판단, 모르는 라벨이면 모두 통과하지 못함
+        """
+        labels = self.get_labels()
+        target_indexes = np.flatnonzero(labels == target_label)
+        if len(target_indexes) == 0:
+            return tuple((False, 0.0) for _ in data)
+
+        if pairwise and self.linear is not None:
+            passed, scores = self.linear.verify(data, target_indexes[0])
+            passed &= scores >= thresh
+            return tuple(zip(passed.tolist(), scores.tolist()))
+
+        return self.proba_to_verify(self.predict_proba(data), target_label, thresh)
+
+    def proba_to_verify(self, results : np.ndarray, target_label : str, thresh : float = 0.0) -> tuple:
+        """predict_proba 결과를 verify와 같은 ((통과 여부, 점수), ...)로 바꾸는 함수
+        """
+        results = np.asarray(results)
+        target_indexes = np.flatnonzero(self.get_labels() == target_label)
+        if len(target_indexes) == 0:
+            return tuple((False, 0.0) for _ in results)
+
+        target_index = target_indexes[0]
+        scores = results[:, target_index]
+        passed = (results.argmax(axis=1) == target_index) & (scores >= thresh)
+
+        return tuple(zip(passed.tolist(), scores.tolist()))
+
     def get_labels(self) -> tuple:
+        if self.linear is not None:
+            return self.linear.classes_
+
         return self.le.classes_
 
 class KerasUtil:
@@ -62,4 +335,4 @@ class KerasUtil:
         pass
 
     def __del__(self):
-        pass
\ No newline at end of file
+        pass
@@ -0,0 +1,80 @@
+import time
+
+import cv2
+import numpy as np
+
+import env
+from PyAutoMakerHuman.hand import draw_landmark_overlay
+
+
+REPEAT = 500
+FRAME_SHAPE = (480, 640, 3)
+
+
+def draw_landmark_loop(img : np.ndarray, landmarks : list) -> np.ndarray:
+    """기존 WorkThread.draw_landmark 방식 (선, 점을 하나씩 그림)
+    """
+    h, w, c = img.shape
+    connects = ((0, 1), (1, 2), (2, 3), (3, 4)
+                , (0, 5), (5, 6), (6, 7), (7, 8)
+                , (5, 9), (9, 13), (13, 17)
+                , (9, 10), (10, 11), (11, 12)
+                , (13, 14), (14, 15), (15, 16)
+                , (17, 18), (18, 19), (19, 20), (0, 17))
+
+    for start_pt, end_pt in connects:
+        start_x, start_y, _ = landmarks[start_pt]
+        end_x, end_y, _ = landmarks[end_pt]
+
+        start_x = int(start_x * w)
+        start_y = int(start_y * h)
+
+        end_x = int(end_x * w)
+        end_y = int(end_y * h)
+
+        cv2.line(img, (start_x, start_y), (end_x, end_y), (255, 255, 255), 2)
+
+    for x, y, z in landmarks:
+        x = int(x * w)
+        y = int(y * h)
+        cv2.circle(img, (x, y), 6, (255, 0, 0), -1)
+
+    return img
+
+
+def benchmark(func, frame : np.ndarray, landmarks_list : np.ndarray) -> float:
+    start_time = time.perf_counter()
+    for _ in range(REPEAT):
+        func(frame.copy(), landmarks_list)
+
+    return (time.perf_counter() - start_time) / REPEAT * 1000
+
+
+def main():
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 255, FRAME_SHAPE, dtype=np.uint8)
+
+    # 손 크기 정도로 모인 좌표, 손끼리는 겹치지 않게 둠 (겹치면 그리는 순서가 달라서 결과가 다를 수 있음)
+    # 마지막 경우는 화면 가장자리에 걸친 손
+    cases = {"1 hand" : [(0.5, 0.5)], "2 hands" : [(0.25, 0.5), (0.75, 0.5)], "edge" : [(0.02, 0.95)]}
+    for case_name, centers in cases.items():
+        landmarks_list = np.stack([rng.uniform(-0.1, 0.1, (21, 3)) + (x, y, 0) for x, y in centers]).astype(np.float32)
+
+        def loop_draw(img, landmarks_list):
+            for landmarks in landmarks_list:
+                img = draw_landmark_loop(img, landmarks)
+            return img
+
+        loop_img = loop_draw(frame.copy(), landmarks_list)
+        overlay_img = draw_landmark_overlay(frame.copy(), landmarks_list)
+        print(f"{case_name}, same : {np.array_equal(loop_img, overlay_img)}")
+
+        # 프레임 복사 시간은 빼고 비교
+        copy_time = benchmark(lambda img, landmarks_list : img, frame, landmarks_list)
+        loop_time = benchmark(loop_draw, frame, landmarks_list) - copy_time
+        overlay_time = benchmark(draw_landmark_overlay, frame, landmarks_list) - copy_time
+        print(f"loop : {loop_time:.4f}ms, overlay : {overlay_time:.4f}ms, x{loop_time / overlay_time:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,7 +12,7 @@ from PySide6.QtWidgets import QApplication, QFileDialog
 import env
 from PyAutoMakerHuman.hand import HandResult
 from PyAutoMakerHuman.hand_train import HandTrainer
-from PyAutoMakerHuman.image import cv2_putText, cv2_imwrite
+from PyAutoMakerHuman.image import cv2_putText
 
 
 file_rename_dict = {
@@ -53,7 +53,7 @@ file_rename_dict = {
     , "ㅞ" : "we.mp4"
 }
 
-mirror_except_list = ["ㅓ", "ㅕ", "ㅔ", "ㅖ"]
+FRAME_DUMP = False
 
 def get_working_dir() -> str:
     app = QApplication(sys.argv)
@@ -62,13 +62,6 @@ def get_working_dir() -> str:
     if window.exec():
         return window.selectedFiles()[0].replace("/", os.path.sep)
 
-def get_key(target_item : str) -> str or None:
-    for key, value in file_rename_dict.items():
-        if target_item == value:
-            return key
-
-    return None
-
 def change_eng_name(file_path : str) -> str:
     paths = file_path.split(os.path.sep)
     name, ext = paths[-1].split(os.path.extsep)
@@ -87,52 +80,13 @@ def main():
     videos = glob(os.path.join(target_dir, "*.mp4"))
     videos = [change_eng_name(path) for path in videos]
 
-    original_dir = os.path.join(target_dir, "origianl")
-    os.path.isdir(original_dir) or os.mkdir(original_dir)
-
-    mirror_dir = os.path.join(target_dir, "mirror")
-    os.path.isdir(mirror_dir) or os.mkdir(mirror_dir)
-
-    for video in videos:
-        org_name = video.split(os.path.sep)[-1]
-        han_name = get_key(org_name)
-        if not han_name:
-            raise RuntimeError(f"{org_name} 비디오 이름 확인하셈")
-
-
-        original_frame_dir = os.path.join(original_dir, han_name)
-        os.path.isdir(original_frame_dir) or os.mkdir(original_frame_dir)
-
-        mirror_frame_dir = os.path.join(mirror_dir, han_name)
-        os.path.isdir(mirror_frame_dir) or os.mkdir(mirror_frame_dir)
-
-        cap = cv2.VideoCapture(video)
-        if not cap.isOpened():
-            raise RuntimeError(f"{video}를 열 수 없습니다.")
-
-        idx = 0
-        while True:
-            success, frame = cap.read()
-            if not success:
-                break
-
-            cv2_imwrite(os.path.join(original_frame_dir, f"{idx}.jpg"), frame)
-            if not han_name in mirror_except_list:
-                frame = cv2.flip(frame, 1)
-            cv2_imwrite(os.path.join(mirror_frame_dir, f"{idx}.jpg"), frame)
-
-            print(f"{han_name} {idx} ... save")
-            idx += 1
-
-        cap.release()
-
-    print("프레임을 모두 저장했습니다")
+    # 디버그용, True면 학습에 사용한 프레임을 jpg로 저장
+    dump_dir = os.path.join(target_dir, "frames") if FRAME_DUMP else None
 
-    train_dict = [(original_dir, "model"), (mirror_dir, "mirror_model")]
-    for dataset, save_path in train_dict:
-        util = HandTrainer()
-        util.train(dataset)
-        util.save(save_path)
+    # 거울모드는 모델 1개로 추론 시에 처리함 (hand_train.mirror_predict_proba, mirror_model_check.py 참고)
+    util = HandTrainer()
+    util.train_video(videos, file_rename_dict, dump_dir = dump_dir)
+    util.save("model")
 
     print("done")
     
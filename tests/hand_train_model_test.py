@@ -8,7 +8,7 @@ from PyAutoMakerHuman.image import cv2_putText
 USE_MIRROR = True
 
 util = HandTrainer()
-util.load("mirror_model" if USE_MIRROR else "model")
+util.load("model")
 
 
 cap = cv2.VideoCapture(0)
@@ -21,7 +21,7 @@ while cap.isOpened():
         if USE_MIRROR:
             frame = cv2.flip(frame, 1)
 
-        result = util.predict(frame)
+        result = util.predict(frame, mirror = USE_MIRROR)
         if result:
             hand_result : HandResult = result[0]
             predict_result = result[1]
@@ -0,0 +1,53 @@
+import os
+import pickle
+
+import numpy as np
+
+import env
+from PyAutoMakerHuman.hand import MIRROR_EXCEPT_LIST
+from PyAutoMakerHuman.hand_train import mirror_predict_proba
+from PyAutoMakerHuman.train import SvmUtil
+
+
+# 예전 거울모드 모델(mirror_model)과 모델 1개 + 반전 추론(mirror_predict_proba)의 결과 비교
+# mirror_model은 더 이상 학습하지 않고 비교 기준으로만 남겨둠
+MODEL_DIR = os.path.join(env.package_dir, "PyAutoMakerHuman", "models")
+MIN_AGREE = 0.95
+
+
+def load_model(name : str) -> SvmUtil:
+    util = SvmUtil()
+    util.load_svm(os.path.join(MODEL_DIR, name))
+    return util
+
+
+def get_sample_datas() -> np.ndarray:
+    """mirror_model의 서포트 벡터를 샘플로 사용, 거울모드 학습 데이터(반전된 프레임) 중 일부
+    """
+    with open(os.path.join(MODEL_DIR, "mirror_model", "svm_model"), "rb") as f:
+        model = pickle.load(f)
+
+    return np.asarray(model.support_vectors_, dtype=np.float32)
+
+
+def main():
+    model = load_model("model")
+    mirror_model = load_model("mirror_model")
+    datas = get_sample_datas()
+
+    old_labels = np.array([name for name, _ in mirror_model.predict(datas)])
+    new_labels = np.array([name for name, _ in model.proba_to_predict(mirror_predict_proba(model, datas))])
+
+    agree = np.mean(old_labels == new_labels)
+    print(f"sample : {len(datas)}, agree : {agree:0.3f}")
+    for label in MIRROR_EXCEPT_LIST:
+        index = old_labels == label
+        if index.any():
+            print(f"{label} : {index.sum()}, agree : {np.mean(new_labels[index] == label):0.3f}")
+
+    assert agree >= MIN_AGREE, f"거울모드 결과가 mirror_model과 다름 ({agree:0.3f})"
+    print("done")
+
+
+if __name__ == "__main__":
+    main()
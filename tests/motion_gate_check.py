@@ -0,0 +1,73 @@
+import cv2
+import numpy as np
+
+import env
+from PyAutoMakerHuman.hand import HandResult
+from PyAutoMakerHuman.motion import MotionGate, GATE_PROCESS, GATE_REUSE
+
+
+# 손 박스 안에서 손가락만 조금 움직였을 때 MotionGate가 이전 결과를 다시 쓰지 않는지 확인
+FRAME_SHAPE = (480, 640, 3)
+HAND_BOX = (260, 160, 120, 160)
+SKIN_COLOR = (120, 150, 200)
+FINGER_SIZE = (10, 40)
+FINGER_MOVE = 2
+FRAME_TIME = 1 / 30
+
+
+class BoxDetector:
+    """항상 HAND_BOX 크기의 손 1개를 찾는 가짜 검출기
+    """
+    def __init__(self):
+        self.count = 0
+
+    def detect(self, img : np.ndarray, timestamp : float = None) -> HandResult:
+        self.count += 1
+        h, w = img.shape[:2]
+        x, y, box_w, box_h = HAND_BOX
+        landmarks = np.zeros((1, 21, 3), np.float32)
+        landmarks[0, :, 0] = np.linspace(x, x + box_w, 21) / w
+        landmarks[0, :, 1] = np.linspace(y, y + box_h, 21) / h
+        return HandResult.from_arrays(img.shape, landmarks, ["Right"])
+
+
+def make_frame(background : np.ndarray, finger_x : int) -> np.ndarray:
+    img = background.copy()
+    x, y, box_w, box_h = HAND_BOX
+    cv2.rectangle(img, (x, y + FINGER_SIZE[1]), (x + box_w, y + box_h), SKIN_COLOR, -1)
+    finger_w, finger_h = FINGER_SIZE
+    cv2.rectangle(img, (finger_x, y), (finger_x + finger_w, y + FINGER_SIZE[1]), SKIN_COLOR, -1)
+    return img
+
+
+def main():
+    rng = np.random.default_rng(0)
+    background = cv2.GaussianBlur(rng.integers(0, 80, FRAME_SHAPE, dtype=np.uint8), (9, 9), 0)
+    finger_x = HAND_BOX[0] + HAND_BOX[2] // 2
+    still = make_frame(background, finger_x)
+    moved = make_frame(background, finger_x + FINGER_MOVE)
+
+    gate = MotionGate()
+    detector = BoxDetector()
+    gate.detect(detector, still, 0.0)
+
+    assert gate.check(still, FRAME_TIME) == GATE_REUSE, "정지 화면은 이전 결과를 다시 써야 함"
+    decision = gate.check(moved, 2 * FRAME_TIME)
+    print(f"finger move : motion {gate.motion:0.4f}, box motion {gate.box_motion:0.4f}")
+    assert gate.motion < gate.motion_threshold, "화면 전체 기준으로는 정지 화면이어야 의미있는 확인"
+    assert decision == GATE_PROCESS, "손 박스 안의 작은 움직임은 다시 검출해야 함"
+
+    # 정지 화면이라도 max_reuse_time이 지나면 다시 검출
+    gate = MotionGate(max_reuse_frames = 1000, max_reuse_time = 0.2)
+    gate.detect(detector, still, 0.0)
+    for index in range(1, 10):
+        gate.detect(detector, still, index * FRAME_TIME)
+
+    print(f"still frames : {gate.get_stats()}")
+    assert gate.get_stats()["process"] >= 2, "max_reuse_time이 지나면 다시 검출해야 함"
+
+    print("done")
+
+
+if __name__ == "__main__":
+    main()
@@ -32,7 +32,7 @@ def main():
     for data_dir, save_dir in [(org_dir, "model"), (mirror_dir, "mirror_model")]:
         train_dir = os.path.join(data_dir, "train")
         util = HandTrainer()
-        util.train(train_dir)
+        util.train(train_dir, workers = 0)
         util.save(save_dir)
 
     print("done")